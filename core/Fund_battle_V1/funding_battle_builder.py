@@ -8,6 +8,9 @@ import logging
 from typing import Dict, List, Any, Tuple
 from decimal import Decimal, InvalidOperation
 
+# 共用的JSON文件读取（项目根目录由入口脚本加入路径）
+from utils.json_io import read_json_file
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('funding_battle_builder')
@@ -302,8 +305,9 @@ class FundingBattleBuilder:
             bool: 是否保存成功
         """
         try:
+            # 结构化事实只作为第二阶段的输入，不需要人工阅读，紧凑写出不缩进
             with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(structured_facts, f, ensure_ascii=False, indent=2)
+                json.dump(structured_facts, f, ensure_ascii=False, separators=(',', ':'))
             
             logger.info(f"结构化事实数据已保存到: {output_path}")
             return True
@@ -323,8 +327,7 @@ class FundingBattleBuilder:
             Dict[str, Any]: 原始数据
         """
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            raw_data = read_json_file(input_path)
             
             logger.info(f"成功加载原始数据: {input_path}")
             return raw_data
@@ -333,21 +336,23 @@ class FundingBattleBuilder:
             logger.error(f"加载原始数据失败: {e}")
             return {}
     
-    def process_file(self, input_path: str, output_path: str) -> bool:
+    def process_file(self, input_path: str, output_path: str, raw_data: Dict[str, Any] = None) -> bool:
         """
         处理单个文件：从原始数据到结构化事实
         
         参数:
             input_path(str): 输入文件路径
             output_path(str): 输出文件路径
+            raw_data(Dict): 调用方已解析的原始数据，提供时不再重复读取解析input_path
             
         返回:
             bool: 是否处理成功
         """
         logger.info(f"开始处理文件: {input_path} -> {output_path}")
         
-        # 加载原始数据
-        raw_data = self.load_raw_data(input_path)
+        # 加载原始数据（已解析时直接复用）
+        if raw_data is None:
+            raw_data = self.load_raw_data(input_path)
         if not raw_data:
             return False
         
@@ -7,6 +7,9 @@ import json
 import logging
 from typing import Dict, List, Any, Optional
 
+# 共用的JSON文件读取（项目根目录由入口脚本加入路径）
+from utils.json_io import read_json_file
+
 # 智能导入处理
 try:
     from core.deepseek_interface import DeepSeekInterface
@@ -229,8 +232,7 @@ class FundingBattleEnricher:
             Optional[Dict]: 结构化事实数据，失败时返回None
         """
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                structured_facts = json.load(f)
+            structured_facts = read_json_file(input_path)
             
             logger.info(f"成功加载结构化事实数据: {input_path}")
             return structured_facts
@@ -4,12 +4,20 @@
 """
 
 import os
+import sys
 import json
+import shutil
 import logging
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# 共用的JSON文件读取（有orjson时优先使用，缺失时回退标准库json）
+from utils.json_io import read_json_file
+
 # 智能导入处理
 try:
     from core.funding_battle_builder import FundingBattleBuilder
@@ -80,28 +88,32 @@ class FundingBattlePipeline:
         clean_code = ts_code.replace(".", "_")
         
         base_name = f"{timestamp}_{clean_name}_{clean_code}"
+        # 中间文件只给流水线自己读取，用纯 ASCII 的短文件名，不带股票中文名
+        intermediate_name = f"{timestamp}_{clean_code}"
         
         return {
-            "structured_facts": f"data/processed/{base_name}_structured_facts.json",
-            "funding_summary": f"data/processed/{base_name}_funding_summary.json",
+            "structured_facts": f"data/processed/{intermediate_name}_structured_facts.json",
+            "funding_summary": f"data/processed/{intermediate_name}_funding_summary.json",
             "analysis_report": f"data/output/posts/{base_name}_analysis_report.md",
             "summary_copy": f"data/output/summaries/{base_name}_summary.json"
         }
     
-    def run_stage1_facts_extraction(self, input_path: str, output_path: str) -> bool:
+    def run_stage1_facts_extraction(self, input_path: str, output_path: str,
+                                    raw_data: Optional[Dict[str, Any]] = None) -> bool:
         """
         运行第一阶段：事实提取（代码预处理）
         
         参数:
             input_path(str): 原始数据路径
             output_path(str): 结构化事实输出路径
+            raw_data(Dict): 已解析的原始数据，提供时不再重复解析input_path
             
         返回:
             bool: 是否成功
         """
         logger.info("🔄 开始第一阶段：事实提取（代码预处理）")
         
-        success = self.builder.process_file(input_path, output_path)
+        success = self.builder.process_file(input_path, output_path, raw_data=raw_data)
         
         if success:
             logger.info("✅ 第一阶段完成：结构化事实数据已生成")
@@ -180,8 +192,7 @@ class FundingBattlePipeline:
         
         try:
             # 读取原始数据获取股票信息
-            with open(input_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            raw_data = read_json_file(input_path)
             
             stocks = raw_data.get("stocks", [])
             if not stocks:
@@ -198,10 +209,11 @@ class FundingBattlePipeline:
             file_paths = self.generate_file_names(stock_name, ts_code)
             result["output_files"] = file_paths
             
-            # 第一阶段：事实提取
+            # 第一阶段：事实提取（复用上面已解析的原始数据）
             stage1_success = self.run_stage1_facts_extraction(
                 input_path, 
-                file_paths["structured_facts"]
+                file_paths["structured_facts"],
+                raw_data=raw_data
             )
             
             if not stage1_success:
@@ -265,11 +277,9 @@ class FundingBattlePipeline:
             target_path(str): 目标文件路径
         """
         try:
-            with open(source_path, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-            
-            with open(target_path, 'w', encoding='utf-8') as f:
-                json.dump(content, f, ensure_ascii=False, indent=2)
+            # 源文件已是同样格式（ensure_ascii=False、indent=2）的JSON，
+            # 直接按字节流式复制，无需解析后再整体序列化一遍
+            shutil.copyfile(source_path, target_path)
             
             logger.info(f"摘要文件已复制到输出目录: {target_path}")
             
@@ -283,29 +293,34 @@ class FundingBattlePipeline:
         参数:
             result(Dict): 运行结果
         """
-        print("\n" + "="*60)
-        print("🎯 龙虎榜资金博弈分析流水线 - 运行结果")
-        print("="*60)
+        # 摘要先拼成完整文本，一次写出到标准输出
+        lines = [
+            "",
+            "="*60,
+            "🎯 龙虎榜资金博弈分析流水线 - 运行结果",
+            "="*60
+        ]
         
         if result["success"]:
-            print("✅ 状态: 运行成功")
-            print(f"⚡ 完成阶段: {result['stages_completed']}/3")
-            print(f"⏱️ 总耗时: {result['processing_time']:.1f}秒")
+            lines.append("✅ 状态: 运行成功")
+            lines.append(f"⚡ 完成阶段: {result['stages_completed']}/3")
+            lines.append(f"⏱️ 总耗时: {result['processing_time']:.1f}秒")
             
-            print("\n📁 输出文件:")
+            lines.append("\n📁 输出文件:")
             for file_type, file_path in result["output_files"].items():
                 if os.path.exists(file_path):
                     file_size = os.path.getsize(file_path)
-                    print(f"  ✓ {file_type}: {file_path} ({file_size} bytes)")
+                    lines.append(f"  ✓ {file_type}: {file_path} ({file_size} bytes)")
                 else:
-                    print(f"  ✗ {file_type}: {file_path} (文件不存在)")
+                    lines.append(f"  ✗ {file_type}: {file_path} (文件不存在)")
             
         else:
-            print("❌ 状态: 运行失败")
-            print(f"⚡ 完成阶段: {result['stages_completed']}/3")
-            print(f"💥 错误信息: {result['error_message']}")
+            lines.append("❌ 状态: 运行失败")
+            lines.append(f"⚡ 完成阶段: {result['stages_completed']}/3")
+            lines.append(f"💥 错误信息: {result['error_message']}")
         
-        print("="*60 + "\n")
+        lines.append("="*60 + "\n")
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 # ====== 主程序入口 ======
@@ -332,8 +347,9 @@ def main():
     pipeline.print_result_summary(result)
     
     # 如果成功，尝试显示报告预览
-    if result["success"] and "analysis_report" in result["output_files"]:
-        report_path = result["output_files"]["analysis_report"]
+    output_files = result["output_files"]
+    if result["success"] and "analysis_report" in output_files:
+        report_path = output_files["analysis_report"]
         if os.path.exists(report_path):
             try:
                 with open(report_path, 'r', encoding='utf-8') as f:
@@ -8,6 +8,9 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+# 共用的JSON文件读取（项目根目录由入口脚本加入路径）
+from utils.json_io import read_json_file
+
 # 智能导入处理
 try:
     from core.deepseek_interface import DeepSeekInterface
@@ -183,8 +186,7 @@ generation_time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             Optional[Dict]: FundingBattleSummary数据，失败时返回None
         """
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                summary = json.load(f)
+            summary = read_json_file(input_path)
             
             logger.info(f"成功加载FundingBattleSummary: {input_path}")
             return summary
@@ -14,9 +14,16 @@ import json
 import logging
 import re
 import os
+import sys
 from datetime import datetime, timedelta
 from data_fetcher import DataFetcher
 
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 共用的JSON文件写出（有orjson时优先使用，缺失时回退标准库json）
+from utils.json_io import write_json_file
+
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -593,8 +600,7 @@ class DataProcessor:
         保存处理后的数据到JSON文件
         """
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(processed_data, f, ensure_ascii=False, indent=2)
+            write_json_file(file_path, processed_data)
             logger.info(f"处理后的数据已保存到: {file_path}")
         except Exception as e:
             logger.error(f"保存数据失败: {str(e)}")
@@ -6,7 +6,6 @@ import os
 import json
 import logging
 from dotenv import load_dotenv
-from openai import OpenAI
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -40,6 +39,9 @@ class DeepSeekInterface:
         logger.info(f"初始化DeepSeek接口，使用模型: {self.model_version}")
         
         # 初始化OpenAI客户端，配置DeepSeek API
+        # openai SDK 导入较慢，推迟到真正创建接口时再导入，
+        # 仅导入本模块（如命令行 --help、参数校验失败）时不必付出这部分启动开销
+        from openai import OpenAI
         self.client = OpenAI(
             api_key=self.api_key,
             base_url="https://api.deepseek.com",
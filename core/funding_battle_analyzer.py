@@ -8,6 +8,7 @@ import json
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -20,6 +21,9 @@ try:
 except ImportError:
     from deepseek_interface import DeepSeekInterface
 
+# 共用的JSON文件读写（有orjson时优先使用，缺失时回退标准库json）
+from utils.json_io import read_json_file, write_json_file
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('funding_battle_analyzer')
@@ -31,11 +35,32 @@ class FundingBattleAnalyzer:
     实现优化的5模块分析流水线（合并模块一+二，模块四+五）
     """
     
-    def __init__(self):
-        """初始化分析器"""
-        self.deepseek = DeepSeekInterface()
+    def __init__(self, deepseek_interface: Optional[DeepSeekInterface] = None):
+        """
+        初始化分析器
+        
+        参数:
+            deepseek_interface: DeepSeek接口实例，如果不提供则自动创建；
+                                批量分析时传入同一实例，可复用客户端与连接池
+        """
+        self.deepseek = deepseek_interface or DeepSeekInterface()
         logger.info("龙虎榜资金博弈分析器初始化完成")
     
+    def extract_stock_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        从龙虎榜数据中取出待分析的单只股票
+        
+        参数:
+            raw_data: 单只股票数据，或包含stocks数组的整批数据
+            
+        返回:
+            单只股票数据（整批数据时取第一只）
+        """
+        # 如果数据包含stocks数组，提取第一个股票数据
+        if 'stocks' in raw_data and len(raw_data['stocks']) > 0:
+            return raw_data['stocks'][0]
+        return raw_data
+    
     def load_seat_data(self, file_path: str) -> Optional[Dict[str, Any]]:
         """
         加载龙虎榜数据
@@ -47,14 +72,8 @@ class FundingBattleAnalyzer:
             解析后的JSON数据，失败返回None
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-            
-            # 如果数据包含stocks数组，提取第一个股票数据
-            if 'stocks' in raw_data and len(raw_data['stocks']) > 0:
-                data = raw_data['stocks'][0]
-            else:
-                data = raw_data
+            raw_data = read_json_file(file_path)
+            data = self.extract_stock_data(raw_data)
                 
             logger.info(f"成功加载龙虎榜数据: {file_path}")
             return data
@@ -339,21 +358,30 @@ class FundingBattleAnalyzer:
             logger.error(f"模块七分析失败: {e}")
             return None
     
-    def analyze_complete_report(self, data_file_path: str, output_path: str = None) -> Optional[Dict[str, Any]]:
+    def analyze_complete_report(self, data_file_path: str = None, output_path: str = None,
+                                data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         执行完整的龙虎榜分析流水线（优化版：5次API调用）
         
         参数:
-            data_file_path: 输入数据文件路径
+            data_file_path: 输入数据文件路径，传入data时可省略
             output_path: 输出文件路径，为None时不保存文件
+            data: 内存中的龙虎榜数据（单只股票或含stocks数组），
+                  提供时直接使用，无需先写临时文件再读回
             
         返回:
             完整的分析报告JSON
         """
         logger.info("开始执行龙虎榜资金博弈分析流水线（优化合并模式）")
         
-        # 加载数据
-        data = self.load_seat_data(data_file_path)
+        # 加载数据（优先使用内存数据，文件路径作为回退）
+        if data is not None:
+            data = self.extract_stock_data(data)
+        elif data_file_path:
+            data = self.load_seat_data(data_file_path)
+        else:
+            logger.error("未提供龙虎榜数据或数据文件路径")
+            return None
         if not data:
             return None
         
@@ -366,25 +394,20 @@ class FundingBattleAnalyzer:
         # 执行各模块分析
         analysis_results = {}
         
-        # 合并模块1+2：上榜原因解读 + 战局总览
-        module_1_2_result = self.module_1_2_combined(data)
-        if module_1_2_result:
-            analysis_results.update(module_1_2_result)
-        
-        # 模块3：核心力量分析
-        module_3_result = self.module_3_key_forces_analysis(data)
-        if module_3_result:
-            analysis_results.update(module_3_result)
-        
-        # 合并模块4+5：买方结构 + 卖方压力分析  
-        module_4_5_result = self.module_4_5_combined(data)
-        if module_4_5_result:
-            analysis_results.update(module_4_5_result)
+        # 模块1+2、3、4+5、6 只依赖原始数据、互不依赖，并发发起API请求；
+        # 结果按模块顺序合并，报告结构与串行执行一致
+        independent_modules = (
+            self.module_1_2_combined,            # 合并模块1+2：上榜原因解读 + 战局总览
+            self.module_3_key_forces_analysis,   # 模块3：核心力量分析
+            self.module_4_5_combined,            # 合并模块4+5：买方结构 + 卖方压力分析
+            self.module_6_historical_context     # 模块6：历史趋势与行为定性
+        )
+        with ThreadPoolExecutor(max_workers=len(independent_modules)) as executor:
+            module_results = list(executor.map(lambda module: module(data), independent_modules))
         
-        # 模块6：历史趋势与行为定性
-        module_6_result = self.module_6_historical_context(data)
-        if module_6_result:
-            analysis_results.update(module_6_result)
+        for module_result in module_results:
+            if module_result:
+                analysis_results.update(module_result)
         
         # 模块7：后市策略与风险展望
         module_7_result = self.module_7_final_verdict(analysis_results)
@@ -405,8 +428,7 @@ class FundingBattleAnalyzer:
         # 保存结果
         if output_path:
             try:
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(final_report, f, ensure_ascii=False, indent=2)
+                write_json_file(output_path, final_report, durable=True)
                 logger.info(f"分析报告已保存至: {output_path}")
             except Exception as e:
                 logger.error(f"保存报告失败: {e}")
@@ -13,10 +13,17 @@ Gushen AI - 龙虎榜帖子生成器 V2.1 (故事化风格版)
 
 import json
 import os
+import sys
 import logging
 from datetime import datetime
 from deepseek_interface import DeepSeekInterface
 
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 共用的JSON文件读取（有orjson时优先使用，缺失时回退标准库json）
+from utils.json_io import read_json_file
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -34,24 +41,48 @@ class PostGeneratorV2:
     - 阶段二: 生成风格化智能问答角
     """
     
-    def __init__(self):
-        """初始化帖子生成器"""
-        self.deepseek = DeepSeekInterface()
+    def __init__(self, deepseek_interface=None):
+        """
+        初始化帖子生成器
+        
+        参数:
+            deepseek_interface (DeepSeekInterface): DeepSeek接口实例，如果不提供则自动创建；
+                批量生成时传入同一实例，可复用客户端与连接池
+        """
+        self.deepseek = deepseek_interface or DeepSeekInterface()
+        # 已确认存在的输出目录，批量保存时每个目录只创建一次
+        self._created_dirs = set()
         logger.info("PostGeneratorV2 初始化完成")
     
+    def ensure_output_dir(self, output_dir):
+        """
+        确保输出目录存在（同一目录只在首次调用时访问文件系统）
+        
+        参数:
+            output_dir (str): 输出目录
+        """
+        if output_dir in self._created_dirs:
+            return
+        os.makedirs(output_dir, exist_ok=True)
+        self._created_dirs.add(output_dir)
+        logger.info(f"输出目录: {os.path.abspath(output_dir)}")
+    
     def load_analysis_data(self, json_file_path):
         """
         加载龙虎榜分析报告JSON数据
         
         参数:
-            json_file_path (str): JSON文件路径
+            json_file_path (str|dict): JSON文件路径，或分析器刚返回的报告字典
             
         返回:
             dict: 解析后的JSON数据
         """
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                analysis_data = json.load(f)
+            if isinstance(json_file_path, dict):
+                # 同一进程内分析完直接生成帖子时，跳过写盘后再读回的往返
+                analysis_data = json_file_path
+            else:
+                analysis_data = read_json_file(json_file_path)
             
             # 验证必要字段
             required_fields = ['stock_info', 'analysis_report']
@@ -59,7 +90,10 @@ class PostGeneratorV2:
                 if field not in analysis_data:
                     raise ValueError(f"JSON数据缺少必要字段: {field}")
             
-            logger.info(f"成功加载分析数据: {json_file_path}")
+            if isinstance(json_file_path, dict):
+                logger.info("使用内存中的分析数据")
+            else:
+                logger.info(f"成功加载分析数据: {json_file_path}")
             return analysis_data
             
         except Exception as e:
@@ -455,8 +489,7 @@ class PostGeneratorV2:
                 output_dir = os.path.join(workspace_root, "data", "output", "posts")
             
             # 创建输出目录
-            os.makedirs(output_dir, exist_ok=True)
-            logger.info(f"输出目录: {os.path.abspath(output_dir)}")
+            self.ensure_output_dir(output_dir)
             
             # 生成文件名
             stock_info = analysis_data.get("stock_info", {})
@@ -488,18 +521,13 @@ class PostGeneratorV2:
                     full_content += stage2_json_data
                     full_content += "\n```\n\n"
             
-            # 保存文件
+            # 保存文件（编码后的字节数即文件大小，写入成功后无需再 stat 校验）
             logger.info(f"正在写入文件，内容长度: {len(full_content)}字符")
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(full_content)
+            payload = full_content.encode('utf-8')
+            with open(filepath, 'wb') as f:
+                f.write(payload)
             
-            # 验证文件是否真的保存了
-            if os.path.exists(filepath):
-                file_size = os.path.getsize(filepath)
-                logger.info(f"✅ 文件保存成功: {os.path.abspath(filepath)}，文件大小: {file_size}字节")
-            else:
-                logger.error(f"❌ 文件保存失败: 文件不存在于 {os.path.abspath(filepath)}")
-                raise Exception(f"文件保存失败: 文件不存在")
+            logger.info(f"✅ 文件保存成功: {os.path.abspath(filepath)}，文件大小: {len(payload)}字节")
             
             return filepath
             
@@ -513,13 +541,16 @@ class PostGeneratorV2:
         完整的帖子生成流程
         
         参数:
-            json_file_path (str): JSON数据文件路径
+            json_file_path (str|dict): JSON数据文件路径，或已在内存中的分析报告字典
             save_thinking (bool): 是否在主文件中包含思考过程和JSON数据
             
         返回:
             dict: 生成结果（所有内容保存在一个Markdown文件中）
         """
-        logger.info(f"开始生成帖子，数据源: {json_file_path}")
+        if isinstance(json_file_path, dict):
+            logger.info("开始生成帖子，数据源: 内存中的分析报告")
+        else:
+            logger.info(f"开始生成帖子，数据源: {json_file_path}")
         
         try:
             # 1. 加载数据
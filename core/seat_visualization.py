@@ -10,13 +10,22 @@ import json
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from plotly.subplots import make_subplots
 import numpy as np
 from typing import Dict, List, Any
 import re
 import os
 
 
+class _BasicMetrics:
+    """席位图关键指标（解析一次，供注释复用）"""
+    __slots__ = ('close', 'pct_change', 'pct_color', 'turnover_rate', 'amount', 'amount_num',
+                 'float_values', 'net_amount', 'net_rate', 'net_color', 'l_buy_num', 'l_sell_num')
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+
 class SeatVisualization:
     """龙虎榜席位可视化类"""
 
@@ -44,6 +53,17 @@ class SeatVisualization:
             '普通席位': '#6B7280'   # 中性灰
         }
 
+        # 关键指标注释的固定片段，初始化时拼好，出图时只拼接动态值
+        self._lbl_close = "<b>收盘价</b>: "
+        self._lbl_pct_prefix = "\t\t\t<b>涨跌幅</b>: <span style='color:"
+        self._lbl_turnover = "</span>\t\t\t<b>换手率</b>: "
+        self._lbl_amount = "\t\t\t<b>成交额</b>: "
+        self._lbl_net_prefix = "<b>龙虎榜净额</b>: <span style='color:"
+        self._lbl_buy_ratio_prefix = ")</span>\t\t\t<b>买入占比</b>: <span style='color:"
+        self._lbl_sell_ratio_prefix = "</span>\t\t\t<b>卖出占比</b>: <span style='color:"
+        self._lbl_float_values = "</span>\t\t\t<b>流通市值</b>: "
+        self._span_style_close = "'>"
+
 
 
     def load_data(self, json_file: str) -> Dict[str, Any]:
@@ -104,6 +124,44 @@ class SeatVisualization:
         else:
             return ""
 
+    def _parse_basic_info(self, basic_info: Dict[str, Any]) -> _BasicMetrics:
+        """一次性解析关键指标并完成颜色判断"""
+        pct_change = basic_info.get('pct_change', '0%')
+        net_amount = basic_info.get('net_amount', '0')
+        amount = basic_info.get('amount', '0')
+
+        # 涨跌幅颜色判断
+        try:
+            pct_value = float(pct_change.replace('%', '')) if pct_change else 0
+            pct_color = self.colors['positive'] if pct_value > 0 else self.colors['negative'] if pct_value < 0 else 'black'
+        except (ValueError, AttributeError):
+            pct_color = 'black'
+
+        # 龙虎榜净额颜色判断
+        try:
+            # 清理货币字符串
+            clean_net = net_amount.replace('万', '').replace('亿', '').replace('-', '').replace('元', '').replace(',', '')
+            net_value = float(clean_net) if clean_net else 0
+            net_color = self.colors['positive'] if not net_amount.startswith('-') and net_value > 0 else self.colors['negative'] if net_amount.startswith('-') else 'black'
+        except (ValueError, AttributeError):
+            net_color = 'black'
+
+        # 展示字段统一转为字符串，便于注释文本直接拼接
+        return _BasicMetrics(
+            close=str(basic_info.get('close', '0.00')),
+            pct_change=str(pct_change),
+            pct_color=pct_color,
+            turnover_rate=str(basic_info.get('turnover_rate', '0%')),
+            amount=str(amount),
+            amount_num=self.format_amount(amount),
+            float_values=str(basic_info.get('float_values', '0')),
+            net_amount=str(net_amount),
+            net_rate=str(basic_info.get('net_rate', '0%')),
+            net_color=net_color,
+            l_buy_num=self.format_amount(basic_info.get('l_buy', '0')),
+            l_sell_num=self.format_amount(basic_info.get('l_sell', '0'))
+        )
+
     def create_seat_battle_chart(self, stock_data: Dict[str, Any]) -> go.Figure:
         """创建席位多空博弈图"""
         basic_info = stock_data.get('basic_info', {})
@@ -122,12 +180,8 @@ class SeatVisualization:
                                  key=lambda x: abs(self.format_amount(x.get('net_amount', '0'))),
                                  reverse=True)[:5]  # 卖出金额从大到小，取前5
 
-        # 创建子图
-        fig = make_subplots(
-            rows=1, cols=1,
-            subplot_titles=[""],  # 清空副标题，整合到主标题中
-            specs=[[{"secondary_y": False}]]
-        )
+        # 单图无需子图网格，直接创建 Figure
+        fig = go.Figure()
 
         # 处理数据，确保买卖方数量一致
         max_seats = max(len(buy_seats_sorted), len(sell_seats_sorted))
@@ -136,10 +190,11 @@ class SeatVisualization:
         position_labels = []
         sell_names = []
         sell_amounts = []
-        sell_amounts_display = []
         buy_names = []
         buy_amounts = []
-        buy_amounts_display = []
+        # 柱状图文本在主循环中一次生成，避免再次遍历拼接
+        sell_texts = [''] * max_seats
+        buy_texts = [''] * max_seats
 
         for i in range(max_seats):
             if i == 0:
@@ -175,11 +230,10 @@ class SeatVisualization:
                 display_name = f"{type_icon} {short_name}{player_tag}"
                 sell_names.append(display_name)
                 sell_amounts.append(-net_amount)  # 负值用于左侧显示
-                sell_amounts_display.append(self.format_amount_display(net_amount))
+                sell_texts[i] = f"<b>{display_name}</b><br><b>{self.format_amount_display(net_amount)}</b>"
             else:
                 sell_names.append("")
                 sell_amounts.append(0)
-                sell_amounts_display.append("")
 
             # 处理买方数据（按金额从大到小）
             if i < len(buy_seats_sorted):
@@ -196,11 +250,10 @@ class SeatVisualization:
                 display_name = f"{type_icon} {short_name}{player_tag}"
                 buy_names.append(display_name)
                 buy_amounts.append(net_amount)
-                buy_amounts_display.append(self.format_amount_display(net_amount))
+                buy_texts[i] = f"<b>{display_name}</b><br><b>{self.format_amount_display(net_amount)}</b>"
             else:
                 buy_names.append("")
                 buy_amounts.append(0)
-                buy_amounts_display.append("")
 
         # 创建卖方柱状图（左侧，绿色）
         fig.add_trace(go.Bar(
@@ -213,8 +266,7 @@ class SeatVisualization:
                 line=dict(color='white', width=1),
                 opacity=0.9  # 添加透明度
             ),
-            text=[f"<b>{name}</b><br><b>{amount_display}</b>"
-                  for name, amount_display in zip(sell_names, sell_amounts_display)],
+            text=sell_texts,
             textposition='outside',
             textfont=dict(size=15, color=self.colors['text'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
             hoverinfo='none',
@@ -232,8 +284,7 @@ class SeatVisualization:
                 line=dict(color='white', width=1),
                 opacity=0.9  # 添加透明度
             ),
-            text=[f"<b>{name}</b><br><b>{amount_display}</b>"
-                  for name, amount_display in zip(buy_names, buy_amounts_display)],
+            text=buy_texts,
             textposition='outside',
             textfont=dict(size=15, color=self.colors['text'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
             hoverinfo='none',
@@ -247,28 +298,82 @@ class SeatVisualization:
         max_amount = max([abs(x) for x in sell_amounts + buy_amounts]) if (sell_amounts + buy_amounts) else 1000
 
         # 准备关键指标数据
-        close_price = basic_info.get('close', '0.00')
-        pct_change = basic_info.get('pct_change', '0%')
-        turnover_rate = basic_info.get('turnover_rate', '0%')
-        amount = basic_info.get('amount', '0')
-        float_values = basic_info.get('float_values', '0')
-        net_amount = basic_info.get('net_amount', '0')
-        net_rate = basic_info.get('net_rate', '0%')
-        l_buy = basic_info.get('l_buy', '0')
-        l_sell = basic_info.get('l_sell', '0')
-
-        # 计算买入占比和卖出占比
-        amount_num = self.format_amount(amount)
-        l_buy_num = self.format_amount(l_buy)
-        l_sell_num = self.format_amount(l_sell)
-
-        buy_ratio = f"{l_buy_num/amount_num*100:.2f}%" if amount_num > 0 else "0%"
-        sell_ratio = f"{l_sell_num/amount_num*100:.2f}%" if amount_num > 0 else "0%"
+        m = self._parse_basic_info(basic_info)
+
+        # 计算买入占比和卖出占比（数值只算一次，同时得到展示文本和颜色）
+        amount_num = m.amount_num
+        if amount_num > 0:
+            buy_ratio_value = m.l_buy_num / amount_num * 100
+            sell_ratio_value = m.l_sell_num / amount_num * 100
+            buy_ratio = f"{buy_ratio_value:.2f}%"
+            sell_ratio = f"{sell_ratio_value:.2f}%"
+        else:
+            buy_ratio_value = sell_ratio_value = 0.0
+            buy_ratio = sell_ratio = "0%"
+        buy_color = self.colors['positive'] if buy_ratio_value > 0 else self.colors['negative'] if buy_ratio_value < 0 else 'black'
+        sell_color = self.colors['positive'] if sell_ratio_value > 0 else self.colors['negative'] if sell_ratio_value < 0 else 'black'
 
         # 格式化股票代码（去掉.SZ/.SH后缀）
         stock_code = stock_data.get('ts_code', '').split('.')[0] if stock_data.get('ts_code') else ''
         stock_name = stock_data.get('name', '')
 
+        # 准备全部注释，随布局一次性写入
+        annotations = [
+            # 关键指标注释 - 第一行
+            dict(
+                text=''.join((
+                    self._lbl_close, m.close,
+                    self._lbl_pct_prefix, m.pct_color, self._span_style_close, m.pct_change,
+                    self._lbl_turnover, m.turnover_rate,
+                    self._lbl_amount, m.amount
+                )),
+                xref="paper", yref="paper",
+                x=0.5, y=1.16,
+                showarrow=False,
+                font=dict(size=15, color=self.colors['text'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
+                align="center"
+            ),
+            # 关键指标注释 - 第二行
+            dict(
+                text=''.join((
+                    self._lbl_net_prefix, m.net_color, self._span_style_close, m.net_amount, " (", m.net_rate,
+                    self._lbl_buy_ratio_prefix, buy_color, self._span_style_close, buy_ratio,
+                    self._lbl_sell_ratio_prefix, sell_color, self._span_style_close, sell_ratio,
+                    self._lbl_float_values, m.float_values
+                )),
+                xref="paper", yref="paper",
+                x=0.5, y=1.11,
+                showarrow=False,
+                font=dict(size=15, color=self.colors['text'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
+                align="center"
+            ),
+            # 买卖方区域标识
+            dict(
+                x=max_amount * 0.7,
+                y=len(position_labels) - 0.3,
+                text="<b>买方席位</b>",
+                showarrow=True,
+                arrowhead=2,
+                arrowcolor=self.colors['buy'],
+                font=dict(size=16, color=self.colors['buy'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
+                bgcolor=f"rgba(255, 68, 68, 0.1)",  # 红色透明背景
+                bordercolor=self.colors['buy'],
+                borderwidth=2
+            ),
+            dict(
+                x=-max_amount * 0.7,
+                y=len(position_labels) - 0.3,
+                text="<b>卖方席位</b>",
+                showarrow=True,
+                arrowhead=2,
+                arrowcolor=self.colors['sell'],
+                font=dict(size=16, color=self.colors['sell'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
+                bgcolor=f"rgba(0, 170, 102, 0.1)",  # 绿色透明背景
+                bordercolor=self.colors['sell'],
+                borderwidth=2
+            )
+        ]
+
         # 更新布局
         fig.update_layout(
             title=dict(
@@ -305,86 +410,8 @@ class SeatVisualization:
             margin=dict(l=100, r=100, t=160, b=100),
             font=dict(family="'PingFang SC', 'Microsoft YaHei', sans-serif", color=self.colors['text']),
             barmode='overlay',  # 重叠模式
-            showlegend=False
-        )
-
-
-
-        # 添加关键指标注释 - 第一行
-        # 涨跌幅颜色判断
-        try:
-            pct_value = float(pct_change.replace('%', '')) if pct_change else 0
-            pct_color = self.colors['positive'] if pct_value > 0 else self.colors['negative'] if pct_value < 0 else 'black'
-        except (ValueError, AttributeError):
-            pct_color = 'black'
-
-        fig.add_annotation(
-            text=f"<b>收盘价</b>: {close_price}\t\t\t<b>涨跌幅</b>: <span style='color:{pct_color}'>{pct_change}</span>\t\t\t<b>换手率</b>: {turnover_rate}\t\t\t<b>成交额</b>: {amount}",
-            xref="paper", yref="paper",
-            x=0.5, y=1.16,
-            showarrow=False,
-            font=dict(size=15, color=self.colors['text'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
-            align="center"
-        )
-
-        # 添加关键指标注释 - 第二行
-        # 龙虎榜净额颜色判断
-        try:
-            # 清理货币字符串
-            clean_net = net_amount.replace('万', '').replace('亿', '').replace('-', '').replace('元', '').replace(',', '')
-            net_value = float(clean_net) if clean_net else 0
-            net_color = self.colors['positive'] if not net_amount.startswith('-') and net_value > 0 else self.colors['negative'] if net_amount.startswith('-') else 'black'
-        except (ValueError, AttributeError):
-            net_color = 'black'
-
-        # 买入占比颜色判断
-        try:
-            buy_ratio_value = float(buy_ratio.replace('%', '')) if buy_ratio else 0
-            buy_color = self.colors['positive'] if buy_ratio_value > 0 else self.colors['negative'] if buy_ratio_value < 0 else 'black'
-        except (ValueError, AttributeError):
-            buy_color = 'black'
-
-        # 卖出占比颜色判断
-        try:
-            sell_ratio_value = float(sell_ratio.replace('%', '')) if sell_ratio else 0
-            sell_color = self.colors['positive'] if sell_ratio_value > 0 else self.colors['negative'] if sell_ratio_value < 0 else 'black'
-        except (ValueError, AttributeError):
-            sell_color = 'black'
-
-        fig.add_annotation(
-            text=f"<b>龙虎榜净额</b>: <span style='color:{net_color}'>{net_amount} ({net_rate})</span>\t\t\t<b>买入占比</b>: <span style='color:{buy_color}'>{buy_ratio}</span>\t\t\t<b>卖出占比</b>: <span style='color:{sell_color}'>{sell_ratio}</span>\t\t\t<b>流通市值</b>: {float_values}",
-            xref="paper", yref="paper",
-            x=0.5, y=1.11,
-            showarrow=False,
-            font=dict(size=15, color=self.colors['text'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
-            align="center"
-        )
-
-        # 添加买卖方区域标识
-        fig.add_annotation(
-            x=max_amount * 0.7,
-            y=len(position_labels) - 0.3,
-            text="<b>买方席位</b>",
-            showarrow=True,
-            arrowhead=2,
-            arrowcolor=self.colors['buy'],
-            font=dict(size=16, color=self.colors['buy'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
-            bgcolor=f"rgba(255, 68, 68, 0.1)",  # 红色透明背景
-            bordercolor=self.colors['buy'],
-            borderwidth=2
-        )
-
-        fig.add_annotation(
-            x=-max_amount * 0.7,
-            y=len(position_labels) - 0.3,
-            text="<b>卖方席位</b>",
-            showarrow=True,
-            arrowhead=2,
-            arrowcolor=self.colors['sell'],
-            font=dict(size=16, color=self.colors['sell'], family="'PingFang SC', 'Microsoft YaHei', sans-serif"),
-            bgcolor=f"rgba(0, 170, 102, 0.1)",  # 绿色透明背景
-            bordercolor=self.colors['sell'],
-            borderwidth=2
+            showlegend=False,
+            annotations=annotations  # 一次性写入全部注释
         )
 
         return fig
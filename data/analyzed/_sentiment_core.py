@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+龙虎榜每日分析汇总 - 单文件解析核心
+=================================
+
+market_sentiment_stats.py 扫描时对每个分析文件执行的热点逻辑：
+读取解析 JSON、分析核心参与者、选择并生成个股标题。
+
+作者：Gushen AI Team
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# 共用的JSON文件读取（项目根目录由入口脚本加入路径）
+from utils.json_io import read_json_file
+
+# 情绪级别对应的 emoji（标题中未知级别统一用📊）
+TITLE_EMOJI = {
+    '亢奋': '🚀',
+    '恐慌': '😰',
+    '分歧': '🤔'
+}
+
+# 知名游资关键词（模块加载时构建一次，标题关键词表由此派生，是唯一的名单来源）
+_FAMOUS_TRADERS: FrozenSet[str] = frozenset({'佛山', '淮海', '东莞', '华鑫', '光大'})
+
+# 标题判断用的特征位：参与者摘要中出现的关键词各对应一位
+TITLE_BIT_INST = 1 << 4     # 机构
+TITLE_BIT_FAMOUS = 1 << 3   # 知名游资
+TITLE_BIT_BUY = 1 << 2      # 买
+TITLE_BIT_SELL = 1 << 1     # 卖
+TITLE_BIT_BATTLE = 1        # 博弈
+
+_TITLE_TOKEN_BITS: Dict[str, int] = {
+    '机构': TITLE_BIT_INST,
+    **{name: TITLE_BIT_FAMOUS for name in sorted(_FAMOUS_TRADERS)},
+    '买': TITLE_BIT_BUY,
+    '卖': TITLE_BIT_SELL,
+    '博弈': TITLE_BIT_BATTLE
+}
+# 所有关键词互不重叠，一次 finditer 扫描摘要即可得到全部特征位
+_TITLE_TOKEN_RE = re.compile('|'.join(_TITLE_TOKEN_BITS))
+
+# 普通散户（既无机构也无知名游资）时按情绪级别选择模板
+_RETAIL_TEMPLATES = {
+    '亢奋': "{name}：散户情绪高涨，{bt}值得关注",
+    '恐慌': "{name}：恐慌抛售加剧，{bt}底部显现"
+}
+_RETAIL_DEFAULT_TEMPLATE = "{name}：多空分歧严重，{bt}方向待定"
+
+# 单只个股的统计条目（紧凑记录，替代每行一个字典）
+# 标题不在扫描时生成，只保存 level 等原始字段，输出时再调用 stock_title 拼接
+StockEntry = namedtuple(
+    'StockEntry',
+    'name ts_code trade_date file verdict confidence_score interpretation behavior_type core_players level'
+)
+
+
+def build_title_templates() -> Tuple[Optional[str], ...]:
+    """把标题判断树展开成按特征位索引的 32 项模板表
+
+    普通散户对应的项为 None，由调用方按情绪级别另行选择。
+    """
+    templates: List[Optional[str]] = []
+    for bits in range(32):
+        has_role = bits & (TITLE_BIT_BUY | TITLE_BIT_SELL | TITLE_BIT_BATTLE)
+        template: Optional[str]
+        if bits & TITLE_BIT_INST and has_role:
+            # 机构+游资博弈
+            template = "{name}：机构游资激烈博弈，{bt}态势明确"
+        elif bits & TITLE_BIT_INST:
+            # 纯机构参与
+            if bits & TITLE_BIT_BUY:
+                template = "{name}：机构重金抄底，{bt}信号强烈"
+            else:
+                template = "{name}：机构大举减仓，{bt}趋势确立"
+        elif bits & TITLE_BIT_FAMOUS:
+            # 知名游资参与
+            if bits & TITLE_BIT_BATTLE:
+                template = "{name}：知名游资对决升级，{bt}成关键"
+            elif bits & TITLE_BIT_BUY:
+                template = "{name}：游资大佬重仓出击，{bt}爆发在即"
+            else:
+                template = "{name}：游资高位派发，{bt}风险加剧"
+        else:
+            # 普通散户或其他情况
+            template = None
+        templates.append(template)
+    return tuple(templates)
+
+
+_TITLE_TEMPLATES = build_title_templates()
+
+
+@lru_cache(maxsize=2048)
+def pick_title_template(level: str, players_summary: str) -> str:
+    """根据情绪级别和核心参与者摘要选择标题模板
+
+    同一天的大量个股共享少数几种 (级别, 参与者摘要) 组合，
+    判断结果按组合缓存，每只个股只需做一次 format。
+    """
+    # 获取情绪emoji
+    emotion_emoji = TITLE_EMOJI.get(level, '📊')
+
+    # 一次扫描得到特征位，再直接查模板表
+    bits = 0
+    for match in _TITLE_TOKEN_RE.finditer(players_summary):
+        bits |= _TITLE_TOKEN_BITS[match.group()]
+
+    template = _TITLE_TEMPLATES[bits]
+    if template is None:
+        template = _RETAIL_TEMPLATES.get(level, _RETAIL_DEFAULT_TEMPLATE)
+
+    return f"{emotion_emoji} {template}"
+
+
+def generate_stock_title(stock_name: str, level: str, verdict: str, behavior_type: str,
+                         core_players: Dict[str, Any], ts_code: str) -> str:
+    """生成个股分析标题"""
+    # 基于核心参与者生成标题差异化
+    players_summary = core_players.get('summary', '普通散户')
+    template = pick_title_template(level, players_summary)
+    title = template.format(name=stock_name, bt=behavior_type)
+
+    # 生成文件链接（基于ts_code）
+    link_url = f"./analysis/{ts_code}_analysis.html"
+
+    # 返回Markdown链接格式
+    return f"[{title}]({link_url})"
+
+
+def stock_title(stock: StockEntry) -> str:
+    """按需生成个股条目的分析标题（只对实际输出的个股调用）"""
+    return generate_stock_title(
+        stock.name, stock.level, stock.verdict, stock.behavior_type, stock.core_players, stock.ts_code
+    )
+
+
+def analyze_core_players(buying_force: List[Dict[str, Any]],
+                         selling_force: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """分析核心参与者，重点关注知名游资"""
+    # 机构买卖标记与去重后的知名游资（dict 作有序集合，摘要中的名字顺序稳定）
+    institutions: Dict[str, bool] = {'buy': False, 'sell': False}
+    famous_traders: Dict[str, Dict[str, None]] = {'buy': {}, 'sell': {}}
+
+    # 买卖双方力量在同一个循环中分析
+    for force, side in ((buying_force, 'buy'), (selling_force, 'sell')):
+        side_traders = famous_traders[side]
+        for player in force:
+            player_type = player.get('player_type', '')
+
+            if player_type == '机构':
+                institutions[side] = True
+            elif player_type == '知名游资':
+                player_name = player.get('player_name', '')
+                if player_name:
+                    side_traders[player_name] = None
+
+    buy_traders = famous_traders['buy']
+    sell_traders = famous_traders['sell']
+
+    # 生成摘要
+    summary_parts: List[str] = []
+
+    # 机构参与情况
+    if institutions['buy'] and institutions['sell']:
+        summary_parts.append("机构(买卖)")
+    elif institutions['buy']:
+        summary_parts.append("机构(买)")
+    elif institutions['sell']:
+        summary_parts.append("机构(卖)")
+
+    # 知名游资参与情况
+    if buy_traders and sell_traders:
+        # 同时有买卖的知名游资
+        all_traders = list({**buy_traders, **sell_traders})
+        if len(all_traders) == 1:
+            summary_parts.append(f"{all_traders[0]}(做T)")
+        else:
+            # 显示所有参与博弈的游资名字
+            trader_names = ",".join(all_traders)
+            summary_parts.append(f"{trader_names}(博弈)")
+    elif buy_traders:
+        # 显示所有买入的游资名字
+        trader_names = ",".join(buy_traders)
+        summary_parts.append(f"{trader_names}(买)")
+    elif sell_traders:
+        # 显示所有卖出的游资名字
+        trader_names = ",".join(sell_traders)
+        summary_parts.append(f"{trader_names}(卖)")
+
+    return {
+        'institutions': institutions,
+        'famous_traders': {'buy': list(buy_traders), 'sell': list(sell_traders)},
+        'summary': " vs ".join(summary_parts) if summary_parts else "普通散户"
+    }
+
+
+def load_and_extract(date_item: str, file_path: str, json_file: str) -> Tuple[str, StockEntry]:
+    """读取并解析单个分析文件，返回 (情绪级别, 个股条目)；供线程池并发调用"""
+    data = read_json_file(file_path)
+
+    # 提取股票基本信息（每层节点只取一次并绑定 get，缺失或为 null 时按空字典处理）
+    stock_info_get = (data.get('stock_info') or {}).get
+    stock_name = stock_info_get('name', 'Unknown')
+    ts_code = stock_info_get('ts_code', 'Unknown')
+    trade_date = stock_info_get('trade_date', date_item)
+
+    # 提取market_sentiment.level和interpretation
+    report_get = (data.get('analysis_report') or {}).get
+    assessment_get = (report_get('overall_assessment') or {}).get
+    sentiment_get = (assessment_get('market_sentiment') or {}).get
+    level = sentiment_get('level', 'Unknown')
+    interpretation = sentiment_get('interpretation', '')
+
+    # 提取更多信息用于展示
+    verdict = assessment_get('verdict', 'Unknown')
+    confidence_score = assessment_get('confidence_score', 0)
+
+    # 提取K线行为类型
+    behavior_type = (report_get('kline_behavior_analysis') or {}).get('behavior_type', 'Unknown')
+
+    # 提取核心参与者信息
+    key_forces_get = (report_get('key_forces') or {}).get
+    buying_force = key_forces_get('buying_force') or []
+    selling_force = key_forces_get('selling_force') or []
+
+    # 分析核心参与者
+    core_players = analyze_core_players(buying_force, selling_force)
+
+    # 添加到统计中
+    stock_entry = StockEntry(
+        name=stock_name,
+        ts_code=ts_code,
+        trade_date=trade_date,
+        file=json_file,
+        verdict=verdict,
+        confidence_score=confidence_score,
+        interpretation=interpretation,
+        behavior_type=behavior_type,
+        core_players=core_players,
+        level=level
+    )
+
+    return level, stock_entry
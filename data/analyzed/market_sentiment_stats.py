@@ -22,130 +22,50 @@ Gushen AI 龙虎榜每日分析汇总报告生成器
 更新：2025-07-27
 """
 
-import json
 import os
-from collections import defaultdict
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import repeat
+from operator import itemgetter
 
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-def generate_stock_title(stock_name, level, verdict, behavior_type, core_players, ts_code):
-    """生成个股分析标题"""
-    emoji_map = {
-        '亢奋': '🚀',
-        '恐慌': '😰',
-        '分歧': '🤔'
-    }
-    
-    # 获取情绪emoji
-    emotion_emoji = emoji_map.get(level, '📊')
-    
-    # 基于核心参与者生成标题差异化
-    players_summary = core_players.get('summary', '普通散户')
-    
-    # 根据不同情况生成标题模板
-    if '机构' in players_summary and any(trader in players_summary for trader in ['买', '卖', '博弈']):
-        # 机构+游资博弈
-        title = f"{emotion_emoji} {stock_name}：机构游资激烈博弈，{behavior_type}态势明确"
-    elif '机构' in players_summary:
-        # 纯机构参与
-        if '买' in players_summary:
-            title = f"{emotion_emoji} {stock_name}：机构重金抄底，{behavior_type}信号强烈"
-        else:
-            title = f"{emotion_emoji} {stock_name}：机构大举减仓，{behavior_type}趋势确立"
-    elif any(famous_trader in players_summary for famous_trader in ['佛山', '淮海', '东莞', '华鑫', '光大']):
-        # 知名游资参与
-        if '博弈' in players_summary:
-            title = f"{emotion_emoji} {stock_name}：知名游资对决升级，{behavior_type}成关键"
-        elif '买' in players_summary:
-            title = f"{emotion_emoji} {stock_name}：游资大佬重仓出击，{behavior_type}爆发在即"
-        else:
-            title = f"{emotion_emoji} {stock_name}：游资高位派发，{behavior_type}风险加剧"
-    else:
-        # 普通散户或其他情况
-        if level == '亢奋':
-            title = f"{emotion_emoji} {stock_name}：散户情绪高涨，{behavior_type}值得关注"
-        elif level == '恐慌':
-            title = f"{emotion_emoji} {stock_name}：恐慌抛售加剧，{behavior_type}底部显现"
-        else:
-            title = f"{emotion_emoji} {stock_name}：多空分歧严重，{behavior_type}方向待定"
-    
-    # 生成文件链接（基于ts_code）
-    link_url = f"./analysis/{ts_code}_analysis.html"
-    
-    # 返回Markdown链接格式
-    return f"[{title}]({link_url})"
+# 单文件解析的热点逻辑放在 _sentiment_core 中；兼容包内导入与在本目录下直接运行
+try:
+    from data.analyzed._sentiment_core import (
+        TITLE_EMOJI,
+        load_and_extract,
+        stock_title,
+    )
+except ImportError:
+    from _sentiment_core import (
+        TITLE_EMOJI,
+        load_and_extract,
+        stock_title,
+    )
 
+# 列表展示用的情绪 emoji（未知级别用❓）
+_LEVEL_EMOJI = {**TITLE_EMOJI, 'Unknown': '❓'}
 
-def analyze_core_players(buying_force, selling_force):
-    """分析核心参与者，重点关注知名游资"""
-    players = {
-        'institutions': {'buy': False, 'sell': False},
-        'famous_traders': {'buy': [], 'sell': []},
-        'summary': ''
-    }
-    
-    # 分析买方力量
-    for player in buying_force:
-        player_type = player.get('player_type', '')
-        player_name = player.get('player_name', '')
-        
-        if player_type == '机构':
-            players['institutions']['buy'] = True
-        elif player_type == '知名游资' and player_name:
-            players['famous_traders']['buy'].append(player_name)
-    
-    # 分析卖方力量
-    for player in selling_force:
-        player_type = player.get('player_type', '')
-        player_name = player.get('player_name', '')
-        
-        if player_type == '机构':
-            players['institutions']['sell'] = True
-        elif player_type == '知名游资' and player_name:
-            players['famous_traders']['sell'].append(player_name)
-    
-    # 生成摘要
-    summary_parts = []
-    
-    # 机构参与情况
-    if players['institutions']['buy'] and players['institutions']['sell']:
-        summary_parts.append("机构(买卖)")
-    elif players['institutions']['buy']:
-        summary_parts.append("机构(买)")
-    elif players['institutions']['sell']:
-        summary_parts.append("机构(卖)")
-    
-    # 知名游资参与情况
-    buy_traders = list(set(players['famous_traders']['buy']))  # 去重
-    sell_traders = list(set(players['famous_traders']['sell']))  # 去重
-    
-    if buy_traders and sell_traders:
-        # 同时有买卖的知名游资
-        all_traders = list(set(buy_traders + sell_traders))
-        if len(all_traders) == 1:
-            summary_parts.append(f"{all_traders[0]}(做T)")
-        else:
-            # 显示所有参与博弈的游资名字
-            trader_names = ",".join(all_traders)
-            summary_parts.append(f"{trader_names}(博弈)")
-    elif buy_traders:
-        if len(buy_traders) == 1:
-            summary_parts.append(f"{buy_traders[0]}(买)")
-        else:
-            # 显示所有买入的游资名字
-            trader_names = ",".join(buy_traders)
-            summary_parts.append(f"{trader_names}(买)")
-    elif sell_traders:
-        if len(sell_traders) == 1:
-            summary_parts.append(f"{sell_traders[0]}(卖)")
-        else:
-            # 显示所有卖出的游资名字
-            trader_names = ",".join(sell_traders)
-            summary_parts.append(f"{trader_names}(卖)")
-    
-    players['summary'] = " vs ".join(summary_parts) if summary_parts else "普通散户"
-    
-    return players
+# 扫描分析文件的并发线程数（I/O 密集，取 CPU 核数的两倍）
+SCAN_MAX_WORKERS = (os.cpu_count() or 1) * 2
+
+# 日报 Markdown 的写缓冲大小
+MARKDOWN_WRITE_BUFFER = 1 << 16
+
+
+def safe_load_and_extract(date_item, file_path, json_file):
+    """线程池任务包装：成功返回 (True, (情绪级别, 个股条目))，出错返回 (False, 异常) 交给主线程记录
+
+    用单独的标志区分成败，情绪级别为 JSON null 的正常文件不会被误判为出错。
+    """
+    try:
+        return True, load_and_extract(date_item, file_path, json_file)
+    except Exception as e:
+        return False, e
 
 
 def scan_market_sentiment_levels():
@@ -155,6 +75,9 @@ def scan_market_sentiment_levels():
     
     # 用于存储统计结果，按日期分组
     daily_stats = defaultdict(lambda: defaultdict(list))  # {date: {level: [stock_list]}}
+    # 计数在扫描时按日期汇总一次，展示和汇总时无需再遍历个股列表
+    level_counts = defaultdict(Counter)  # {date: {level: count}}
+    daily_totals = Counter()  # {date: count}
     total_stocks = 0
     error_files = []
     
@@ -162,95 +85,80 @@ def scan_market_sentiment_levels():
     print(f"📁 扫描目录: {current_dir}")
     print("-" * 80)
     
-    # 遍历所有日期目录，但只处理20250702
-    date_dirs = [item for item in os.listdir(current_dir) 
-                 if os.path.isdir(os.path.join(current_dir, item)) and item.isdigit() and len(item) == 8]
-    date_dirs.sort()  # 按日期排序
-    
     # 只处理7月2号的数据
-    target_date = "20250702"
-    filtered_date_dirs = [date for date in date_dirs if date == target_date]
-    
-    for date_item in filtered_date_dirs:
-        date_dir = os.path.join(current_dir, date_item)
-        print(f"📅 处理日期: {date_item}")
-        
-        # 遍历该日期目录下的所有json文件
-        json_files = [f for f in os.listdir(date_dir) if f.endswith('_analysis.json')]
-        print(f"   📄 找到{len(json_files)}个分析文件")
-        
-        daily_stock_count = 0
-        for json_file in json_files:
-            file_path = os.path.join(date_dir, json_file)
+    target_dates = {"20250702"}
+    
+    # 遍历所有日期目录（scandir 一次返回目录项类型，无需逐个 isdir）
+    with os.scandir(current_dir) as it:
+        date_entries = sorted(
+            ((entry.name, entry.path) for entry in it
+             if entry.is_dir() and entry.name.isdigit() and len(entry.name) == 8),
+            key=lambda item: item[0]
+        )  # 按日期排序
+    
+    # 线程池在所有日期间复用；读取和解析在工作线程完成
+    with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+        for date_item, date_dir in date_entries:
+            if date_item not in target_dates:
+                continue
+            print(f"📅 处理日期: {date_item}")
             
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # 提取股票基本信息
-                stock_info = data.get('stock_info', {})
-                stock_name = stock_info.get('name', 'Unknown')
-                ts_code = stock_info.get('ts_code', 'Unknown')
-                trade_date = stock_info.get('trade_date', date_item)
-                
-                # 提取market_sentiment.level和interpretation
-                analysis_report = data.get('analysis_report', {})
-                overall_assessment = analysis_report.get('overall_assessment', {})
-                market_sentiment = overall_assessment.get('market_sentiment', {})
-                level = market_sentiment.get('level', 'Unknown')
-                interpretation = market_sentiment.get('interpretation', '')
-                
-                # 提取更多信息用于展示
-                verdict = overall_assessment.get('verdict', 'Unknown')
-                confidence_score = overall_assessment.get('confidence_score', 0)
-                
-                # 提取K线行为类型
-                kline_behavior_analysis = analysis_report.get('kline_behavior_analysis', {})
-                behavior_type = kline_behavior_analysis.get('behavior_type', 'Unknown')
-                
-                # 提取核心参与者信息
-                key_forces = analysis_report.get('key_forces', {})
-                buying_force = key_forces.get('buying_force', [])
-                selling_force = key_forces.get('selling_force', [])
-                
-                # 分析核心参与者
-                core_players = analyze_core_players(buying_force, selling_force)
-                
-                # 生成个股分析标题
-                stock_title = generate_stock_title(stock_name, level, verdict, behavior_type, core_players, ts_code)
-                
-                # 添加到统计中
-                stock_entry = {
-                    'name': stock_name,
-                    'ts_code': ts_code,
-                    'trade_date': trade_date,
-                    'file': json_file,
-                    'verdict': verdict,
-                    'confidence_score': confidence_score,
-                    'interpretation': interpretation,
-                    'behavior_type': behavior_type,
-                    'core_players': core_players,
-                    'title': stock_title  # 新增题目字段
-                }
-                
-                daily_stats[date_item][level].append(stock_entry)
-                total_stocks += 1
-                daily_stock_count += 1
+            # 遍历该日期目录下的所有json文件（DirEntry 自带类型信息，is_file 不额外 stat）
+            # 文件名和路径分成两个列表，直接作为 executor.map 的参数序列，
+            # 省去每个文件一次 lambda 调用和元组下标访问
+            json_names = []
+            json_paths = []
+            with os.scandir(date_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.endswith('_analysis.json') and entry.is_file():
+                        json_names.append(name)
+                        json_paths.append(entry.path)
+            print(f"   📄 找到{len(json_names)}个分析文件")
+            
+            # 并发读取解析，按目录顺序在主线程汇总（无需加锁，输出顺序稳定）
+            results = executor.map(safe_load_and_extract, repeat(date_item), json_paths, json_names)
+            
+            # 逐文件只做一次列表追加，各项计数在当日文件处理完后一次性得出
+            date_stats = defaultdict(list)  # {level: [stock_list]}
+            for json_file, file_path, (ok, payload) in zip(json_names, json_paths, results):
+                if not ok:
+                    error_files.append({
+                        'file': file_path,
+                        'error': str(payload)
+                    })
+                    print(f"   ❌ 处理文件错误: {json_file} - {payload}")
+                    continue
                 
-            except Exception as e:
-                error_files.append({
-                    'file': file_path,
-                    'error': str(e)
-                })
-                print(f"   ❌ 处理文件错误: {json_file} - {e}")
-        
-        print(f"   ✅ 成功处理{daily_stock_count}个股票")
-        print()
+                level, stock_entry = payload
+                date_stats[level].append(stock_entry)
+            
+            daily_stock_count = 0
+            if date_stats:
+                daily_stats[date_item] = date_stats
+                level_counts[date_item].update({level: len(stocks) for level, stocks in date_stats.items()})
+                daily_stock_count = sum(level_counts[date_item].values())
+                daily_totals[date_item] += daily_stock_count
+                total_stocks += daily_stock_count
+            
+            print(f"   ✅ 成功处理{daily_stock_count}个股票")
+            print()
     
-    return daily_stats, total_stocks, error_files
+    return daily_stats, total_stocks, error_files, level_counts, daily_totals
+
 
+def rank_levels(date_stats, date_counts):
+    """按个股数量从多到少排列当日情绪级别
+    
+    返回 [(level, stocks, count), ...]，数量预先取出，
+    排序键与后续展示都直接复用，避免逐项调用 lambda/len。
+    """
+    level_list = [(level, stocks, date_counts[level]) for level, stocks in date_stats.items()]
+    level_list.sort(key=itemgetter(2), reverse=True)
+    return level_list
 
-def display_statistics(daily_stats, total_stocks, error_files):
+
+def display_statistics(daily_stats, total_stocks, error_files, level_counts, daily_totals):
     """显示按日期分组的统计结果"""
     print("\n" + "=" * 100)
     print("📊 龙虎榜每日分析汇总报告")
@@ -264,51 +172,53 @@ def display_statistics(daily_stats, total_stocks, error_files):
     # 按日期顺序展示
     for date in sorted(daily_stats.keys()):
         date_stats = daily_stats[date]
-        daily_total = sum(len(stocks) for stocks in date_stats.values())
+        date_counts = level_counts[date]
+        daily_total = daily_totals[date]
+        if not daily_total:
+            continue
         
         # 格式化日期显示
         formatted_date = f"{date[:4]}-{date[4:6]}-{date[6:8]}"
         
         print("┌" + "─" * 98 + "┐")
-        print(f"│ 📅 {formatted_date} 龙虎榜分析汇总 (共{daily_total}只股票)" + " " * (98 - len(f" {formatted_date} 龙虎榜分析汇总 (共{daily_total}只股票)") - 3) + "│")
+        header = f" 📅 {formatted_date} 龙虎榜分析汇总 (共{daily_total}只股票)"
+        print(f"│{header:<97}│")
         print("├" + "─" * 98 + "┤")
         
         # 按个股数量排序情绪级别
-        sorted_levels = sorted(date_stats.items(), key=lambda x: len(x[1]), reverse=True)
+        sorted_levels = rank_levels(date_stats, date_counts)
         
-        for level, stocks in sorted_levels:
-            percentage = (len(stocks) / daily_total * 100) if daily_total > 0 else 0
+        for level, stocks, count in sorted_levels:
+            percentage = count / daily_total * 100
             
             # 选择合适的emoji
-            level_emoji = {
-                '亢奋': '🚀',
-                '恐慌': '😰', 
-                '分歧': '🤔',
-                'Unknown': '❓'
-            }.get(level, '📊')
+            level_emoji = _LEVEL_EMOJI.get(level, '📊')
             
-            print(f"│ {level_emoji} 【{level}】: {len(stocks)}只 ({percentage:.1f}%)" + " " * (98 - len(f" {level_emoji} 【{level}】: {len(stocks)}只 ({percentage:.1f}%)")) + "│")
+            level_line = f" {level_emoji} 【{level}】: {count}只 ({percentage:.1f}%)"
+            print(f"│{level_line:<98}│")
             
             # 显示前5只代表性股票
             display_stocks = stocks[:5]
             for i, stock in enumerate(display_stocks):
-                confidence = stock.get('confidence_score', 0)
-                verdict = stock.get('verdict', 'Unknown')
-                behavior_type = stock.get('behavior_type', 'Unknown')
-                core_players = stock.get('core_players', {})
+                confidence = stock.confidence_score
+                verdict = stock.verdict
+                behavior_type = stock.behavior_type
+                core_players = stock.core_players
                 players_summary = core_players.get('summary', '普通散户')
-                title = stock.get('title', f"[{stock['name']}分析](./analysis/{stock['ts_code']}_analysis.html)")
+                title = stock_title(stock)
                 prefix = "│   ├─" if i < len(display_stocks) - 1 else "│   └─"
                 
                 # 从markdown链接中提取纯文本标题用于控制台显示
-                title_text = title.split(']')[0][1:] if '[' in title and ']' in title else f"{stock['name']}分析"
+                title_text = title.split(']')[0][1:] if '[' in title and ']' in title else f"{stock.name}分析"
                 stock_info = f"{title_text} (置信度:{confidence:.2f})"
-                print(f"{prefix} {stock_info}" + " " * (98 - len(f"{prefix} {stock_info}")) + "│")
+                stock_line = f"{prefix} {stock_info}"
+                print(f"{stock_line:<98}│")
             
             # 如果股票太多，显示省略信息
-            if len(stocks) > 5:
-                remaining = len(stocks) - 5
-                print(f"│     ... 还有{remaining}只股票" + " " * (98 - len(f"     ... 还有{remaining}只股票")) + "│")
+            if count > 5:
+                remaining = count - 5
+                more_line = f"     ... 还有{remaining}只股票"
+                print(f"│{more_line:<98}│")
             
             print("│" + " " * 98 + "│")
         
@@ -320,21 +230,15 @@ def display_statistics(daily_stats, total_stocks, error_files):
     print("📈 跨日期汇总统计")
     print("=" * 100)
     
-    all_levels = defaultdict(int)
-    for date_stats in daily_stats.values():
-        for level, stocks in date_stats.items():
-            all_levels[level] += len(stocks)
+    all_levels = Counter()
+    for date_counts in level_counts.values():
+        all_levels.update(date_counts)
     
     sorted_all_levels = sorted(all_levels.items(), key=lambda x: x[1], reverse=True)
     
     for level, count in sorted_all_levels:
         percentage = (count / total_stocks * 100) if total_stocks > 0 else 0
-        level_emoji = {
-            '亢奋': '🚀',
-            '恐慌': '😰', 
-            '分歧': '🤔',
-            'Unknown': '❓'
-        }.get(level, '📊')
+        level_emoji = _LEVEL_EMOJI.get(level, '📊')
         
         print(f"{level_emoji} 【{level}】: {count}只股票 ({percentage:.1f}%)")
     
@@ -345,7 +249,7 @@ def display_statistics(daily_stats, total_stocks, error_files):
             print(f"   {error['file']}: {error['error']}")
 
 
-def save_mobile_version(daily_stats, total_stocks):
+def save_mobile_version(daily_stats, total_stocks, level_counts, daily_totals):
     """保存移动端友好的统计结果到Markdown文件"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = f"每日汇总帖子_mobile.md"
@@ -361,7 +265,10 @@ def save_mobile_version(daily_stats, total_stocks):
     # 生成每日报告
     for date in sorted(daily_stats.keys()):
         date_stats = daily_stats[date]
-        daily_total = sum(len(stocks) for stocks in date_stats.values())
+        date_counts = level_counts[date]
+        daily_total = daily_totals[date]
+        if not daily_total:
+            continue
         formatted_date = f"{date[:4]}-{date[4:6]}-{date[6:8]}"
         
         md_content.append(f"## 📅 {formatted_date} 龙虎榜分析")
@@ -370,7 +277,7 @@ def save_mobile_version(daily_stats, total_stocks):
         md_content.append("")
         
         # 统计当日情绪分布
-        sorted_levels = sorted(date_stats.items(), key=lambda x: len(x[1]), reverse=True)
+        sorted_levels = rank_levels(date_stats, date_counts)
         
         # 情绪分布表格（简化版）
         md_content.append("### 情绪分布")
@@ -378,24 +285,18 @@ def save_mobile_version(daily_stats, total_stocks):
         md_content.append("| 情绪 | 数量 | 占比 |")
         md_content.append("|------|------|------|")
         
-        for level, stocks in sorted_levels:
-            percentage = (len(stocks) / daily_total * 100) if daily_total > 0 else 0
-            emoji = {
-                '亢奋': '🚀',
-                '恐慌': '😰', 
-                '分歧': '🤔',
-                'Unknown': '❓'
-            }.get(level, '📊')
+        for level, stocks, count in sorted_levels:
+            percentage = count / daily_total * 100
+            emoji = _LEVEL_EMOJI.get(level, '📊')
             
-            md_content.append(f"| {emoji} {level} | {len(stocks)}只 | {percentage:.1f}% |")
+            md_content.append(f"| {emoji} {level} | {count}只 | {percentage:.1f}% |")
         
         md_content.append("")
         
         # 生成关键洞察
         if sorted_levels:
-            dominant_level = sorted_levels[0][0]
-            dominant_count = len(sorted_levels[0][1])
-            dominant_percentage = (dominant_count / daily_total * 100) if daily_total > 0 else 0
+            dominant_level, _, dominant_count = sorted_levels[0]
+            dominant_percentage = dominant_count / daily_total * 100
             
             md_content.append("### 🎯 关键洞察")
             md_content.append("")
@@ -424,37 +325,32 @@ def save_mobile_version(daily_stats, total_stocks):
         md_content.append("")
         
         # 详细个股列表（移动端优化版）
-        for level, stocks in sorted_levels:
-            emoji = {
-                '亢奋': '🚀',
-                '恐慌': '😰', 
-                '分歧': '🤔',
-                'Unknown': '❓'
-            }.get(level, '📊')
+        for level, stocks, count in sorted_levels:
+            emoji = _LEVEL_EMOJI.get(level, '📊')
             
-            md_content.append(f"## {emoji} {level}情绪个股 ({len(stocks)}只)")
+            md_content.append(f"## {emoji} {level}情绪个股 ({count}只)")
             md_content.append("")
             
             # 只显示前10只股票
-            display_count = min(10, len(stocks))
+            display_count = min(10, count)
             for i, stock in enumerate(stocks[:display_count]):
-                verdict = stock.get('verdict', 'Unknown')
-                behavior_type = stock.get('behavior_type', 'Unknown')
-                core_players = stock.get('core_players', {})
+                verdict = stock.verdict
+                behavior_type = stock.behavior_type
+                core_players = stock.core_players
                 players_summary = core_players.get('summary', '普通散户')
                 
                 # 获取标题（去掉emoji）
-                title = stock.get('title', f"[{stock['name']}分析](./analysis/{stock['ts_code']}_analysis.html)")
+                title = stock_title(stock)
                 # 提取标题文本并去掉emoji
                 if '[' in title and ']' in title:
                     title_parts = title.split(']')[0][1:].split(' ', 1)
-                    if len(title_parts) > 1 and title_parts[0] in ['🚀', '😰', '🤔']:
+                    if len(title_parts) > 1 and title_parts[0] in TITLE_EMOJI.values():
                         clean_title = title_parts[1]
                     else:
-                        clean_title = title_parts[0] if title_parts else stock['name']
-                    title_link = f"[**{clean_title}**](./analysis/{stock['ts_code']}_analysis.html)"
+                        clean_title = title_parts[0] if title_parts else stock.name
+                    title_link = f"[**{clean_title}**](./analysis/{stock.ts_code}_analysis.html)"
                 else:
-                    title_link = f"[**{stock['name']}分析**](./analysis/{stock['ts_code']}_analysis.html)"
+                    title_link = f"[**{stock.name}分析**](./analysis/{stock.ts_code}_analysis.html)"
                 
                 md_content.append(f"{title_link}  ")
                 md_content.append(f"**结论**: {verdict} | **形态**: {behavior_type}  ")
@@ -464,8 +360,8 @@ def save_mobile_version(daily_stats, total_stocks):
                 md_content.append("")
             
             # 如果股票太多，显示提示
-            if len(stocks) > display_count:
-                remaining = len(stocks) - display_count
+            if count > display_count:
+                remaining = count - display_count
                 md_content.append("### 更多股票...")
                 md_content.append(f"> 注：为节省空间，其余{remaining}只{level}情绪个股请在GushenAI中查看完整表格")
                 md_content.append("")
@@ -488,130 +384,122 @@ def save_mobile_version(daily_stats, total_stocks):
     return output_path
 
 
-def save_to_file(daily_stats, total_stocks):
-    """保存每日报告格式的统计结果到Markdown文件"""
+def save_to_file(daily_stats, total_stocks, level_counts, daily_totals):
+    """保存每日报告格式的统计结果到Markdown文件
+    
+    报告边生成边写入缓冲文件，不在内存中累积整份 Markdown。
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = f"lhb_daily_analysis_summary_{timestamp}.md"
     
-    # 生成Markdown内容
     current_time = datetime.now()
-    md_content = []
-    
-    # 报告标题
-    md_content.append("# 📊 Gushen AI 龙虎榜每日分析汇总")
-    md_content.append("")
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.join(current_dir, output_file)
     
-    # 生成每日报告
-    for date in sorted(daily_stats.keys()):
-        date_stats = daily_stats[date]
-        daily_total = sum(len(stocks) for stocks in date_stats.values())
-        formatted_date = f"{date[:4]}-{date[4:6]}-{date[6:8]}"
-        
-        md_content.append(f"## 📅 {formatted_date} 龙虎榜分析汇总")
-        md_content.append("")
-        md_content.append(f"**📊 当日统计**: 共分析 {daily_total} 只个股")
-        md_content.append("")
-        
-        # 统计当日情绪分布
-        sorted_levels = sorted(date_stats.items(), key=lambda x: len(x[1]), reverse=True)
+    # 保存Markdown文件（二进制缓冲写入，逐行编码后直接输出）
+    with open(output_path, 'wb', buffering=MARKDOWN_WRITE_BUFFER) as out:
+        def emit(line):
+            out.write(line.encode('utf-8'))
+            out.write(b'\n')
         
-        # 情绪分布表格
-        md_content.append("### 情绪分布概览")
-        md_content.append("")
-        md_content.append("| 情绪级别 | 数量 | 占比 | 代表个股 |")
-        md_content.append("|---------|------|------|---------|")
+        # 报告标题
+        emit("# 📊 Gushen AI 龙虎榜每日分析汇总")
+        emit("")
         
-        for level, stocks in sorted_levels:
-            percentage = (len(stocks) / daily_total * 100) if daily_total > 0 else 0
-            emoji = {
-                '亢奋': '🚀',
-                '恐慌': '😰', 
-                '分歧': '🤔',
-                'Unknown': '❓'
-            }.get(level, '📊')
+        # 生成每日报告
+        for date in sorted(daily_stats.keys()):
+            date_stats = daily_stats[date]
+            date_counts = level_counts[date]
+            daily_total = daily_totals[date]
+            if not daily_total:
+                continue
+            formatted_date = f"{date[:4]}-{date[4:6]}-{date[6:8]}"
             
-            # 选择前3只代表个股
-            representative_stocks = stocks[:3]
-            stock_names = [f"{s['name']}" for s in representative_stocks]
-            if len(stocks) > 3:
-                stock_names.append(f"等{len(stocks)}只")
+            emit(f"## 📅 {formatted_date} 龙虎榜分析汇总")
+            emit("")
+            emit(f"**📊 当日统计**: 共分析 {daily_total} 只个股")
+            emit("")
             
-            md_content.append(f"| {emoji} {level} | {len(stocks)}只 | {percentage:.1f}% | {', '.join(stock_names)} |")
-        
-        md_content.append("")
-        
-        # 生成关键洞察
-        if sorted_levels:
-            dominant_level = sorted_levels[0][0]
-            dominant_count = len(sorted_levels[0][1])
-            dominant_percentage = (dominant_count / daily_total * 100) if daily_total > 0 else 0
+            # 统计当日情绪分布
+            sorted_levels = rank_levels(date_stats, date_counts)
             
-            md_content.append("### 🎯 关键洞察")
-            md_content.append("")
-            md_content.append(f"**主导情绪**: {dominant_level} ({dominant_count}只, {dominant_percentage:.1f}%)")
-            md_content.append("")
+            # 情绪分布表格
+            emit("### 情绪分布概览")
+            emit("")
+            emit("| 情绪级别 | 数量 | 占比 | 代表个股 |")
+            emit("|---------|------|------|---------|")
             
-            # 个股情绪判断
-            if dominant_level == "亢奋" and dominant_percentage > 50:
-                market_mood = "个股情绪普遍高涨，多头氛围浓厚"
-                risk_level = "中等偏高"
-            elif dominant_level == "恐慌" and dominant_percentage > 40:
-                market_mood = "个股恐慌情绪蔓延，空头压制明显"
-                risk_level = "高风险"
-            elif dominant_level == "分歧":
-                market_mood = "个股分歧严重，多空博弈激烈"
-                risk_level = "高波动"
-            else:
-                market_mood = "个股情绪相对均衡"
-                risk_level = "中等"
+            for level, stocks, count in sorted_levels:
+                percentage = count / daily_total * 100
+                emoji = _LEVEL_EMOJI.get(level, '📊')
+                
+                # 选择前3只代表个股
+                representative_stocks = stocks[:3]
+                stock_names = [s.name for s in representative_stocks]
+                if count > 3:
+                    stock_names.append(f"等{count}只")
+                
+                emit(f"| {emoji} {level} | {count}只 | {percentage:.1f}% | {', '.join(stock_names)} |")
             
-            md_content.append(f"**整体特征**: {market_mood}")
-            md_content.append("")
-            md_content.append(f"**风险等级**: {risk_level}")
-            md_content.append("")
-        
-        # 详细个股列表
-        md_content.append("### 📋 详细个股分析")
-        md_content.append("")
-        
-        for level, stocks in sorted_levels:
-            emoji = {
-                '亢奋': '🚀',
-                '恐慌': '😰', 
-                '分歧': '🤔',
-                'Unknown': '❓'
-            }.get(level, '📊')
+            emit("")
             
-            md_content.append(f"#### {emoji} {level}情绪个股 ({len(stocks)}只)")
-            md_content.append("")
-            md_content.append("| 代码 | 分析结论 | K线形态 | 核心参与者 | 题目 |")
-            md_content.append("|------|---------|---------|----------|------|")
+            # 生成关键洞察
+            if sorted_levels:
+                dominant_level, _, dominant_count = sorted_levels[0]
+                dominant_percentage = dominant_count / daily_total * 100
+                
+                emit("### 🎯 关键洞察")
+                emit("")
+                emit(f"**主导情绪**: {dominant_level} ({dominant_count}只, {dominant_percentage:.1f}%)")
+                emit("")
+                
+                # 个股情绪判断
+                if dominant_level == "亢奋" and dominant_percentage > 50:
+                    market_mood = "个股情绪普遍高涨，多头氛围浓厚"
+                    risk_level = "中等偏高"
+                elif dominant_level == "恐慌" and dominant_percentage > 40:
+                    market_mood = "个股恐慌情绪蔓延，空头压制明显"
+                    risk_level = "高风险"
+                elif dominant_level == "分歧":
+                    market_mood = "个股分歧严重，多空博弈激烈"
+                    risk_level = "高波动"
+                else:
+                    market_mood = "个股情绪相对均衡"
+                    risk_level = "中等"
+                
+                emit(f"**整体特征**: {market_mood}")
+                emit("")
+                emit(f"**风险等级**: {risk_level}")
+                emit("")
             
-            for stock in stocks:
-                verdict = stock.get('verdict', 'Unknown')
-                behavior_type = stock.get('behavior_type', 'Unknown')
-                core_players = stock.get('core_players', {})
-                players_summary = core_players.get('summary', '普通散户')
-                title = stock.get('title', f"[{stock['name']}分析](./analysis/{stock['ts_code']}_analysis.html)")
+            # 详细个股列表
+            emit("### 📋 详细个股分析")
+            emit("")
+            
+            for level, stocks, count in sorted_levels:
+                emoji = _LEVEL_EMOJI.get(level, '📊')
                 
-                md_content.append(f"| {stock['ts_code']} | {verdict} | {behavior_type} | {players_summary} | {title} |")
+                emit(f"#### {emoji} {level}情绪个股 ({count}只)")
+                emit("")
+                emit("| 代码 | 分析结论 | K线形态 | 核心参与者 | 题目 |")
+                emit("|------|---------|---------|----------|------|")
+                
+                # 当前级别的表格行直接批量写出
+                out.writelines(
+                    f"| {stock.ts_code} | {stock.verdict} | {stock.behavior_type} | "
+                    f"{stock.core_players.get('summary', '普通散户')} | {stock_title(stock)} |\n".encode('utf-8')
+                    for stock in stocks
+                )
+                
+                emit("")
             
-            md_content.append("")
+            emit("---")
+            emit("")
         
-        md_content.append("---")
-        md_content.append("")
-    
-    # 添加报告结尾
-    md_content.append("*本报告由 Gushen AI 自动生成，仅供参考，不构成投资建议*")
-    md_content.append("")
-    md_content.append(f"*报告生成时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}*")
-    
-    # 保存Markdown文件
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    output_path = os.path.join(current_dir, output_file)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(md_content))
+        # 添加报告结尾（最后一行不带换行）
+        emit("*本报告由 Gushen AI 自动生成，仅供参考，不构成投资建议*")
+        emit("")
+        out.write(f"*报告生成时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}*".encode('utf-8'))
     
     print(f"📝 每日报告已保存到: {output_file}")
     return output_path
@@ -623,15 +511,15 @@ def main():
     print("=" * 80)
     
     # 扫描并统计
-    daily_stats, total_stocks, error_files = scan_market_sentiment_levels()
+    daily_stats, total_stocks, error_files, level_counts, daily_totals = scan_market_sentiment_levels()
     
     # 显示结果
-    display_statistics(daily_stats, total_stocks, error_files)
+    display_statistics(daily_stats, total_stocks, error_files, level_counts, daily_totals)
     
     # 保存到文件
     if total_stocks > 0:
         # 只生成移动端版报告
-        save_mobile_version(daily_stats, total_stocks)
+        save_mobile_version(daily_stats, total_stocks, level_counts, daily_totals)
     
     print("\n✅ 每日分析报告生成完成! 🎉")
 
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+JSON数组切分差分测试
+逐字符扫描与 numpy 向量化两种实现必须对任意输入给出完全相同的切分结果，
+任何一方单独修改后结果分叉，这里都会失败
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+# 添加父目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import _json_splitter
+from utils._json_splitter import _split_top_level_scan
+
+np = pytest.importorskip("numpy")
+
+# 随机输入的字符表：覆盖结构字符、转义、多字节中文与空白
+_ALPHABET = ['{', '}', '"', '\\', ',', ':', 'a', '1', ' ', '\n', '中', '文', '[', ']']
+
+
+def _random_text(rng, length):
+    """生成由结构字符与普通字符随机组成的文本"""
+    return ''.join(rng.choice(_ALPHABET) for _ in range(length))
+
+
+def _random_array_content(rng, count):
+    """生成形如真实数据的数组内容：转义后的JSON对象字符串以逗号连接"""
+    items = []
+    for i in range(count):
+        value = rng.choice(['普通文本', '含\\"引号\\"', '含逗号,和{括号}', '反斜杠\\\\结尾\\\\', ''])
+        items.append('"{\\"id\\": %d, \\"text\\": \\"%s\\", \\"nested\\": {\\"k\\": [1, 2]}}"' % (i, value))
+    return ', '.join(items)
+
+
+def _assert_same(text):
+    assert _json_splitter._split_top_level_vectorized(text) == _split_top_level_scan(text)
+
+
+def test_random_structural_text_matches_scan():
+    """随机结构字符文本：两种实现结果一致"""
+    rng = random.Random(20250805)
+    for _ in range(2000):
+        _assert_same(_random_text(rng, rng.randint(0, 200)))
+
+
+def test_array_like_content_matches_scan():
+    """接近真实数据的长数组内容：两种实现结果一致"""
+    rng = random.Random(7)
+    for count in (1, 2, 10, 200, 1000):
+        _assert_same(_random_array_content(rng, count))
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    ",",
+    ",,",
+    " , ",
+    "\\",
+    "\\\\,",
+    "\\,a",
+    '"a,b",c',
+    '{"a":1},{"b":2}',
+    '}{,}',
+    '"\\\\",x',
+    '中,文',
+])
+def test_edge_cases_match_scan(text):
+    """边界输入：空串、转义逗号、不配对的括号与引号"""
+    _assert_same(text)
+
+
+def test_split_top_level_uses_vectorized_for_long_input():
+    """超过阈值的输入走向量化分支，结果仍与逐字符扫描一致"""
+    rng = random.Random(42)
+    text = _random_array_content(rng, 400)
+    assert len(text) >= _json_splitter.VECTORIZE_MIN_SIZE
+    assert _json_splitter.split_top_level(text) == _split_top_level_scan(text)
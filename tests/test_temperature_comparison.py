@@ -5,21 +5,46 @@
 支持并发执行以提高生成速度
 """
 
+import contextlib
+import functools
+import importlib.util
 import os
 import json
 import logging
+import threading
 import time
+from collections import defaultdict
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple
 
+# 工作区根目录与温度测试的默认输出目录（导入时解析一次，保存文件时不再重复求绝对路径）
+_WORKSPACE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DEFAULT_OUTPUT_DIR = os.path.join(_WORKSPACE_ROOT, "data", "output", "posts", "temperature_test")
+
 # 添加父目录到Python路径
 import sys
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(_WORKSPACE_ROOT)
+
+# 共用的JSON文件写出（有orjson时优先使用，缺失时回退标准库json）
+from utils.json_io import write_json_file
+
+
+@functools.lru_cache(maxsize=None)
+def _load_huoshan_interface_class():
+    """按需导入火山引擎版本的接口类
+    
+    由于文件名包含特殊字符，使用importlib按路径作为模块导入（可复用 __pycache__ 中的字节码）；
+    首次用到时才执行，导入本模块（如 pytest 收集）时不要求接口的依赖已安装
+    """
+    spec = importlib.util.spec_from_file_location(
+        "huoshan_deepseek_interface",
+        os.path.join(_WORKSPACE_ROOT, "core", "deepseek_interface(huoshan).py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.HuoshanDeepSeekInterface
 
-# 导入火山引擎版本的接口
-exec(open('deepseek_interface(huoshan).py').read())
-# 现在HuoshanDeepSeekInterface类已经可用
 
 # 配置日志
 logging.basicConfig(
@@ -28,39 +53,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger('temperature_test')
 
+# 同时在途的火山引擎API请求上限的默认值（可用环境变量 HUOSHAN_MAX_CONC 按账号限额覆盖）
+DEFAULT_MAX_CONCURRENCY = 4
 
-class TemperatureTestGenerator:
-    """
-    修改版的HuoshanPostGeneratorV2，支持自定义温度参数
-    """
-    
-    def __init__(self, temperature: float):
-        """初始化带温度参数的生成器"""
-        self.temperature = temperature
-        self.huoshan = HuoshanDeepSeekInterface()
-        logger.info(f"初始化温度测试生成器，temperature={temperature}")
-    
-    def load_analysis_data(self, json_file_path):
-        """加载龙虎榜分析报告JSON数据"""
-        try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                analysis_data = json.load(f)
-            
-            # 验证必要字段
-            required_fields = ['stock_info', 'analysis_report']
-            for field in required_fields:
-                if field not in analysis_data:
-                    raise ValueError(f"JSON数据缺少必要字段: {field}")
-            
-            return analysis_data
-        except Exception as e:
-            logger.error(f"加载分析数据失败: {str(e)}")
-            raise
-    
-    def build_stage1_prompt(self, analysis_data):
-        """构建阶段一的Prompt (生成故事化帖子主干)"""
-        # 构建System Prompt
-        system_prompt = """# 核心角色
+
+def read_max_concurrency():
+    """读取并校验API并发上限，非整数或小于1时抛出 ValueError"""
+    raw_value = os.getenv("HUOSHAN_MAX_CONC", str(DEFAULT_MAX_CONCURRENCY))
+    try:
+        max_concurrency = int(raw_value)
+    except ValueError:
+        raise ValueError(f"HUOSHAN_MAX_CONC 必须是整数，当前值: {raw_value!r}") from None
+    if max_concurrency < 1:
+        raise ValueError(f"HUOSHAN_MAX_CONC 必须大于等于1，当前值: {max_concurrency}")
+    return max_concurrency
+
+
+# 阶段一的System Prompt (生成故事化帖子主干)，所有任务共用
+_STAGE1_SYSTEM_PROMPT = """# 核心角色
 你是一位**在A股市场沉浮多年、已经形成稳定交易体系的顶级操盘手**。你正在写自己的盘后复盘笔记，你的语言**冷静、果断**，语言沉稳中带着犀利、直达本质。
 ## 核心原则：盘感为先，逻辑佐证
 - **第一人称视角**
@@ -123,25 +133,9 @@ class TemperatureTestGenerator:
 3.  **任务列表 (`- [ ]`):** 
 4.  **Mermaid流程图:**
 """
-        
-        # 构建User Prompt
-        user_prompt = f"""
-好了，股神AI。现在，这是你需要分析的战场报告（JSON格式）。请严格遵循你的角色设定和所有指令，将它变成一篇让散户拍案叫绝的"资金对决"故事。
-
-**战场报告:**
-```json
-{json.dumps(analysis_data, ensure_ascii=False, indent=2)}
-```
 
-请现在开始你的创作，记住，不要生成"智能问答角"部分。
-"""
-        
-        return system_prompt, user_prompt
-    
-    def build_stage2_prompt(self, analysis_data, stage1_content):
-        """构建阶段二的Prompt (生成三角色评论区互动)"""
-        # 构建System Prompt
-        system_prompt = """# **`=` 核心角色 `=`**
+# 阶段二的System Prompt (生成三角色评论区互动)，所有任务共用
+_STAGE2_SYSTEM_PROMPT = """# **`=` 核心角色 `=`**
 
 你是一位**A股市场沉浮多年、已经形成稳定交易体系的顶级操盘手**。为了全面评估一只股票的博弈态势，你习惯于**在脑海中扮演市场的不同参与者**，进行一场思想实验。你能够轻易地在三种人格之间切换：
 
@@ -230,6 +224,80 @@ class TemperatureTestGenerator:
   }
 }
 ```"""
+
+
+def render_analysis_json(analysis_data):
+    """把分析数据渲染成提示词中使用的JSON文本"""
+    return json.dumps(analysis_data, ensure_ascii=False, indent=2)
+
+
+class TemperatureTestGenerator:
+    """
+    修改版的HuoshanPostGeneratorV2，支持自定义温度参数
+    """
+    
+    def __init__(self, temperature: float, huoshan=None, api_semaphore=None):
+        """初始化带温度参数的生成器
+        
+        huoshan 为可共享的接口实例；并发任务共用一个实例即可复用同一个
+        HTTP 连接池，未传入时才新建。
+        api_semaphore 为所有任务、两个阶段共用的请求闸门，限制同时在途的
+        API请求数；未传入时不限制。
+        """
+        self.temperature = temperature
+        self.huoshan = huoshan or _load_huoshan_interface_class()()
+        self.api_semaphore = api_semaphore or contextlib.nullcontext()
+        logger.info("初始化温度测试生成器，temperature=%s", temperature)
+    
+    def load_analysis_data(self, json_file_path):
+        """加载龙虎榜分析报告JSON数据（也可直接传入已加载的字典）"""
+        try:
+            if isinstance(json_file_path, dict):
+                analysis_data = json_file_path
+            else:
+                with open(json_file_path, 'r', encoding='utf-8') as f:
+                    analysis_data = json.load(f)
+            
+            # 验证必要字段
+            required_fields = ['stock_info', 'analysis_report']
+            for field in required_fields:
+                if field not in analysis_data:
+                    raise ValueError(f"JSON数据缺少必要字段: {field}")
+            
+            return analysis_data
+        except Exception as e:
+            logger.error("加载分析数据失败: %s", e)
+            raise
+    
+    def build_stage1_prompt(self, analysis_data, analysis_json=None):
+        """构建阶段一的Prompt (生成故事化帖子主干)"""
+        if analysis_json is None:
+            analysis_json = render_analysis_json(analysis_data)
+        
+        # System Prompt 是固定文本，直接使用模块级常量
+        system_prompt = _STAGE1_SYSTEM_PROMPT
+        
+        # 构建User Prompt
+        user_prompt = f"""
+好了，股神AI。现在，这是你需要分析的战场报告（JSON格式）。请严格遵循你的角色设定和所有指令，将它变成一篇让散户拍案叫绝的"资金对决"故事。
+
+**战场报告:**
+```json
+{analysis_json}
+```
+
+请现在开始你的创作，记住，不要生成"智能问答角"部分。
+"""
+        
+        return system_prompt, user_prompt
+    
+    def build_stage2_prompt(self, analysis_data, stage1_content, analysis_json=None):
+        """构建阶段二的Prompt (生成三角色评论区互动)"""
+        if analysis_json is None:
+            analysis_json = render_analysis_json(analysis_data)
+        
+        # System Prompt 是固定文本，直接使用模块级常量
+        system_prompt = _STAGE2_SYSTEM_PROMPT
         
         # 构建User Prompt
         user_prompt = f"""
@@ -237,7 +305,7 @@ class TemperatureTestGenerator:
 
 **分析数据:**
 ```json
-{json.dumps(analysis_data, ensure_ascii=False, indent=2)}
+{analysis_json}
 ```
 
 请严格按照JSON格式输出，确保三个角色的风格差异明显。
@@ -245,38 +313,39 @@ class TemperatureTestGenerator:
         
         return system_prompt, user_prompt
     
-    def generate_stage1_content(self, analysis_data):
+    def generate_stage1_content(self, analysis_data, analysis_json=None):
         """生成阶段一内容 (故事化帖子主干) - 使用自定义温度"""
-        logger.info(f"开始生成阶段一内容，temperature={self.temperature}")
+        logger.info("开始生成阶段一内容，temperature=%s", self.temperature)
         
         # 构建Prompt
-        system_prompt, user_prompt = self.build_stage1_prompt(analysis_data)
+        system_prompt, user_prompt = self.build_stage1_prompt(analysis_data, analysis_json)
         
         # 调用火山引擎API
         try:
             # 直接传入prompt字符串
             full_prompt = f"System: {system_prompt}\n\nUser: {user_prompt}"
             
-            stage1_content, thinking_process = self.huoshan.generate_text_with_thinking(
-                full_prompt,
-                max_tokens=32768,
-                temperature=self.temperature,  # 使用自定义温度
-                timeout=180
-            )
+            with self.api_semaphore:
+                stage1_content, thinking_process = self.huoshan.generate_text_with_thinking(
+                    full_prompt,
+                    max_tokens=32768,
+                    temperature=self.temperature,  # 使用自定义温度
+                    timeout=180
+                )
             
-            logger.info(f"阶段一生成完成，内容长度: {len(stage1_content)}字符")
+            logger.info("阶段一生成完成，内容长度: %d字符", len(stage1_content))
             return stage1_content, thinking_process
             
         except Exception as e:
-            logger.error(f"阶段一生成失败: {str(e)}")
+            logger.error("阶段一生成失败: %s", e)
             raise
     
-    def generate_stage2_content(self, analysis_data, stage1_content):
+    def generate_stage2_content(self, analysis_data, stage1_content, analysis_json=None):
         """生成阶段二内容 (三角色评论区互动) - 使用自定义温度"""
-        logger.info(f"开始生成阶段二内容，temperature={self.temperature}")
+        logger.info("开始生成阶段二内容，temperature=%s", self.temperature)
         
         # 构建Prompt
-        system_prompt, user_prompt = self.build_stage2_prompt(analysis_data, stage1_content)
+        system_prompt, user_prompt = self.build_stage2_prompt(analysis_data, stage1_content, analysis_json)
         
         # 定义JSON Schema
         json_schema = """{
@@ -291,14 +360,15 @@ class TemperatureTestGenerator:
             # 合并prompt
             full_prompt = f"{system_prompt}\n\n{user_prompt}"
             
-            json_result = self.huoshan.generate_json_output_with_validation(
-                full_prompt,
-                json_schema,
-                required_fields=["title", "bull_comment", "bear_comment", "QA"],
-                max_tokens=32768,
-                temperature=self.temperature,  # 使用自定义温度
-                timeout=180
-            )
+            with self.api_semaphore:
+                json_result = self.huoshan.generate_json_output_with_validation(
+                    full_prompt,
+                    json_schema,
+                    required_fields=["title", "bull_comment", "bear_comment", "QA"],
+                    max_tokens=32768,
+                    temperature=self.temperature,  # 使用自定义温度
+                    timeout=180
+                )
             
             if json_result is None:
                 logger.error("阶段二JSON生成失败")
@@ -307,11 +377,11 @@ class TemperatureTestGenerator:
             # 将JSON结果转换为Markdown格式
             stage2_content = self.format_comments_json_to_markdown(json_result)
             
-            logger.info(f"阶段二生成完成，内容长度: {len(stage2_content)}字符")
+            logger.info("阶段二生成完成，内容长度: %d字符", len(stage2_content))
             return stage2_content, json.dumps(json_result, ensure_ascii=False, indent=2)
             
         except Exception as e:
-            logger.error(f"阶段二生成失败: {str(e)}")
+            logger.error("阶段二生成失败: %s", e)
             raise
     
     def format_comments_json_to_markdown(self, json_result):
@@ -319,25 +389,21 @@ class TemperatureTestGenerator:
         required_fields = ["title", "bull_comment", "bear_comment", "QA"]
         for field in required_fields:
             if field not in json_result:
-                logger.error(f"JSON数据格式错误，缺少{field}字段")
+                logger.error("JSON数据格式错误，缺少%s字段", field)
                 return "评论区生成失败"
         
-        # 构建Markdown内容，包含标题
+        # 先取出各字段，最后一次性拼出完整的Markdown
         title = json_result.get("title", "龙虎榜资金博弈解读")
-        markdown_content = f"# {title}\n\n"
-        markdown_content += "## 💬 评论区热议\n\n"
         
         # 多头观点
         bull_comment = json_result["bull_comment"]
         bull_nickname = bull_comment.get("nickname", "格局哥")
         bull_content = bull_comment.get("content", "")
-        markdown_content += f"### 🔥 多头观点\n**@{bull_nickname}**: {bull_content}\n\n"
         
         # 空头提醒
         bear_comment = json_result["bear_comment"]
         bear_nickname = bear_comment.get("nickname", "利好兑现就跑路")
         bear_content = bear_comment.get("content", "")
-        markdown_content += f"### ⚠️ 空头提醒\n**@{bear_nickname}**: {bear_content}\n\n"
         
         # 新手求教
         qa_section = json_result["QA"]
@@ -348,24 +414,23 @@ class TemperatureTestGenerator:
         questioner_content = questioner.get("content", "")
         answerer_content = answerer.get("content", "")
         
-        markdown_content += f"### ❓ 新手求教\n**@{questioner_nickname}**: {questioner_content}\n\n"
-        markdown_content += f"**回复**: {answerer_content}\n\n"
-        
-        # 添加免责声明
-        markdown_content += "---\n*本评论区为AI模拟生成，仅供参考，投资需谨慎*\n"
-        
-        return markdown_content
+        return (
+            f"# {title}\n\n"
+            "## 💬 评论区热议\n\n"
+            f"### 🔥 多头观点\n**@{bull_nickname}**: {bull_content}\n\n"
+            f"### ⚠️ 空头提醒\n**@{bear_nickname}**: {bear_content}\n\n"
+            f"### ❓ 新手求教\n**@{questioner_nickname}**: {questioner_content}\n\n"
+            f"**回复**: {answerer_content}\n\n"
+            # 免责声明
+            "---\n*本评论区为AI模拟生成，仅供参考，投资需谨慎*\n"
+        )
     
     def save_post(self, content, analysis_data, temperature, run_number, output_dir=None):
         """保存帖子到文件，文件名包含温度值和运行次数"""
         try:
             # 使用绝对路径
             if output_dir is None:
-                # 获取当前脚本的目录
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                # 获取workspace根目录
-                workspace_root = os.path.dirname(current_dir)
-                output_dir = os.path.join(workspace_root, "data", "output", "posts", "temperature_test")
+                output_dir = _DEFAULT_OUTPUT_DIR
             
             # 创建输出目录
             os.makedirs(output_dir, exist_ok=True)
@@ -378,35 +443,41 @@ class TemperatureTestGenerator:
             
             # 文件名包含温度值和运行次数
             filename = f"{trade_date}_{stock_name}_huoshan_post_v2.1_{timestamp}-{temperature}-run{run_number}.md"
-            filepath = os.path.join(output_dir, filename)
-            
-            # 在内容开头添加温度信息
-            content_with_info = f"<!-- 温度设置: {temperature} | 运行次数: {run_number} -->\n\n{content}"
+            filepath = os.path.abspath(os.path.join(output_dir, filename))
             
-            # 保存文件
+            # 保存文件：先写温度信息头，再直接写正文，不拼接出整篇内容的副本
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content_with_info)
+                f.write(f"<!-- 温度设置: {temperature} | 运行次数: {run_number} -->\n\n")
+                f.write(content)
             
-            logger.info(f"✅ 文件保存成功: {os.path.abspath(filepath)}")
+            logger.info("✅ 文件保存成功: %s", filepath)
             return filepath
             
         except Exception as e:
-            logger.error(f"保存帖子失败: {str(e)}")
+            logger.error("保存帖子失败: %s", e)
             raise
     
-    def generate_post(self, json_file_path, run_number=1):
-        """完整的帖子生成流程"""
-        logger.info(f"开始生成帖子，温度={self.temperature}，运行次数={run_number}")
+    def generate_post(self, json_file_path, run_number=1, analysis_json=None):
+        """完整的帖子生成流程
+        
+        json_file_path 可以是文件路径或已加载的分析数据字典；
+        analysis_json 为预先渲染好的JSON文本，两个阶段的提示词共用。
+        """
+        logger.info("开始生成帖子，温度=%s，运行次数=%s", self.temperature, run_number)
         
         try:
             # 1. 加载数据
             analysis_data = self.load_analysis_data(json_file_path)
+            if analysis_json is None:
+                analysis_json = render_analysis_json(analysis_data)
             
-            # 2. 生成阶段一内容
-            stage1_content, thinking1 = self.generate_stage1_content(analysis_data)
-            
-            # 3. 生成阶段二内容
-            stage2_content, thinking2 = self.generate_stage2_content(analysis_data, stage1_content)
+            # 2/3. 阶段二的提示词只用到分析数据、不依赖阶段一的输出，
+            # 两个阶段同时发起请求，单个任务耗时降为较慢的那一阶段
+            with ThreadPoolExecutor(max_workers=2) as stage_executor:
+                stage1_future = stage_executor.submit(self.generate_stage1_content, analysis_data, analysis_json)
+                stage2_future = stage_executor.submit(self.generate_stage2_content, analysis_data, None, analysis_json)
+                stage1_content, thinking1 = stage1_future.result()
+                stage2_content, thinking2 = stage2_future.result()
             
             # 4. 合并内容
             final_content = stage1_content + "\n\n---\n\n" + stage2_content
@@ -431,7 +502,7 @@ class TemperatureTestGenerator:
             return result
             
         except Exception as e:
-            logger.error(f"帖子生成失败: {str(e)}")
+            logger.error("帖子生成失败: %s", e)
             return {
                 "success": False,
                 "temperature": self.temperature,
@@ -440,16 +511,16 @@ class TemperatureTestGenerator:
             }
 
 
-def generate_with_temperature(args: Tuple[float, str, int]) -> Dict:
+def generate_with_temperature(args: Tuple[float, Dict, int, str, object, object]) -> Dict:
     """为单个温度值生成帖子的函数（用于并发执行）"""
-    temperature, json_file_path, run_number = args
+    temperature, analysis_data, run_number, analysis_json, huoshan, api_semaphore = args
     
     try:
-        generator = TemperatureTestGenerator(temperature)
-        result = generator.generate_post(json_file_path, run_number)
+        generator = TemperatureTestGenerator(temperature, huoshan, api_semaphore)
+        result = generator.generate_post(analysis_data, run_number, analysis_json)
         return result
     except Exception as e:
-        logger.error(f"温度{temperature}运行{run_number}生成失败: {str(e)}")
+        logger.error("温度%s运行%s生成失败: %s", temperature, run_number, e)
         return {
             "success": False,
             "temperature": temperature,
@@ -463,7 +534,14 @@ def run_temperature_comparison_test():
     # 测试配置
     temperatures = [0.5, 0.6, 0.7, 0.8, 1.0, 1.2]
     runs_per_temperature = 2
-    max_workers = 3  # 并发线程数
+    # 每个任务一个线程，实际并发请求数由 API 并发上限控制
+    max_workers = len(temperatures) * runs_per_temperature
+    
+    try:
+        max_concurrency = read_max_concurrency()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
     
     # 数据文件路径
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -478,13 +556,28 @@ def run_temperature_comparison_test():
     print(f"📊 测试温度值: {temperatures}")
     print(f"🔄 每个温度运行次数: {runs_per_temperature}")
     print(f"⚡ 并发线程数: {max_workers}")
+    print(f"🚦 API并发上限: {max_concurrency}")
     print("=" * 60)
     
+    # 分析数据只读取、渲染一次，所有任务共享
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            analysis_data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ 数据文件读取失败: {json_file_path} - {e}")
+        return
+    analysis_json = render_analysis_json(analysis_data)
+    
+    # 所有任务共用一个接口实例（底层 OpenAI 客户端线程安全），复用连接池
+    shared_huoshan = _load_huoshan_interface_class()()
+    # 所有任务、两个阶段共用的请求闸门：线程数不再决定并发量，真正的请求数由它限制
+    api_semaphore = threading.BoundedSemaphore(max_concurrency)
+    
     # 准备所有任务
     tasks = []
     for temp in temperatures:
         for run in range(1, runs_per_temperature + 1):
-            tasks.append((temp, json_file_path, run))
+            tasks.append((temp, analysis_data, run, analysis_json, shared_huoshan, api_semaphore))
     
     # 统计信息
     total_tasks = len(tasks)
@@ -502,7 +595,7 @@ def run_temperature_comparison_test():
         # 获取结果
         for future in as_completed(future_to_task):
             task = future_to_task[future]
-            temp, _, run = task
+            temp, _, run, _, _, _ = task
             
             try:
                 result = future.result()
@@ -531,18 +624,22 @@ def run_temperature_comparison_test():
     
     # 按温度分组统计
     print("\n📈 各温度生成情况:")
+    # 一次遍历把成功结果的内容长度按温度分桶，不再对每个温度重扫全部结果
+    lengths_by_temp = defaultdict(list)
+    for r in results:
+        if r["success"]:
+            lengths_by_temp[r.get("temperature")].append(r["content_length"])
     for temp in temperatures:
-        temp_results = [r for r in results if r.get("temperature") == temp and r["success"]]
-        if temp_results:
-            avg_length = sum(r["content_length"] for r in temp_results) / len(temp_results)
-            print(f"  温度 {temp}: {len(temp_results)} 个成功，平均长度 {avg_length:.0f} 字符")
+        temp_lengths = lengths_by_temp.get(temp)
+        if temp_lengths:
+            avg_length = sum(temp_lengths) / len(temp_lengths)
+            print(f"  温度 {temp}: {len(temp_lengths)} 个成功，平均长度 {avg_length:.0f} 字符")
         else:
             print(f"  温度 {temp}: 0 个成功")
     
     # 保存测试报告
     report_path = os.path.join(
-        os.path.dirname(current_dir), 
-        "data", "output", "posts", "temperature_test",
+        _DEFAULT_OUTPUT_DIR,
         f"temperature_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     )
     
@@ -551,6 +648,7 @@ def run_temperature_comparison_test():
             "temperatures": temperatures,
             "runs_per_temperature": runs_per_temperature,
             "max_workers": max_workers,
+            "max_concurrent_requests": max_concurrency,
             "total_time_seconds": elapsed_time
         },
         "summary": {
@@ -562,8 +660,7 @@ def run_temperature_comparison_test():
     }
     
     os.makedirs(os.path.dirname(report_path), exist_ok=True)
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump(report_data, f, ensure_ascii=False, indent=2)
+    write_json_file(report_path, report_data)
     
     print(f"\n📄 测试报告已保存: {report_path}")
     print("\n✨ 温度对比测试完成!")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON数组切分核心
+================
+
+json_cleaner.clean_json_array 的热点逻辑：扫描数组内容，
+在引号和花括号之外的逗号处切分出各个JSON字符串。
+"""
+
+from typing import Any, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+# 超过该长度（字符数）时改用 numpy 向量化切分，更短的文本逐字符扫描即可
+VECTORIZE_MIN_SIZE = 8 * 1024
+
+_BACKSLASH = ord('\\')
+_QUOTE = ord('"')
+_LBRACE = ord('{')
+_RBRACE = ord('}')
+_COMMA = ord(',')
+
+
+def split_top_level(inner_content: str) -> List[str]:
+    """
+    按顶层逗号切分数组内容（已去掉外层方括号）
+
+    Args:
+        inner_content: 数组内部的文本
+
+    Returns:
+        去掉首尾空白的各段字符串
+    """
+    if np is not None and len(inner_content) >= VECTORIZE_MIN_SIZE:
+        return _split_top_level_vectorized(inner_content)
+    return _split_top_level_scan(inner_content)
+
+
+def _split_top_level_scan(inner_content: str) -> List[str]:
+    """逐字符扫描的切分实现（只记录分段起点，切分时一次切片，不逐字符拼接）"""
+    json_strings: List[str] = []
+    start = 0
+    in_quotes = False
+    escape_next = False
+    bracket_count = 0
+
+    for i, char in enumerate(inner_content):
+        if escape_next:
+            escape_next = False
+            continue
+
+        if char == '\\':
+            escape_next = True
+            continue
+
+        if char == '"':
+            in_quotes = not in_quotes
+            continue
+
+        if not in_quotes:
+            if char == '{':
+                bracket_count += 1
+            elif char == '}':
+                bracket_count -= 1
+            elif char == ',' and bracket_count == 0:
+                # 找到分隔符
+                json_strings.append(inner_content[start:i].strip())
+                start = i + 1
+
+    # 添加最后一个JSON字符串
+    last_str = inner_content[start:].strip()
+    if last_str:
+        json_strings.append(last_str)
+
+    return json_strings
+
+
+def _split_top_level_vectorized(inner_content: str) -> List[str]:
+    """
+    numpy 向量化的切分实现，结果与逐字符扫描完全一致
+
+    在 UTF-8 字节上整体比较出结构字符（反斜杠、引号、花括号、逗号）的位置，
+    之后的状态计算只在这些位置上进行。多字节字符的每个字节都不会落在
+    ASCII 范围内，结构字符的判定不受中文影响，切分点也必然在字符边界上。
+    """
+    buf = inner_content.encode('utf-8')
+    arr: Any = np.frombuffer(buf, dtype=np.uint8)
+
+    positions = np.flatnonzero(
+        (arr == _BACKSLASH) | (arr == _QUOTE) | (arr == _LBRACE) | (arr == _RBRACE) | (arr == _COMMA)
+    )
+    chars = arr[positions]
+    index = np.arange(len(positions))
+
+    # 1. 被转义的字符：紧邻其前的连续反斜杠为奇数个
+    is_backslash = chars == _BACKSLASH
+    # 与前一个结构字符相邻且都是反斜杠，说明属于同一段连续反斜杠
+    continues_run = np.zeros(len(positions), dtype=bool)
+    continues_run[1:] = is_backslash[1:] & is_backslash[:-1] & (positions[1:] == positions[:-1] + 1)
+    run_start = np.maximum.accumulate(np.where(continues_run, 0, index))
+    # 每个反斜杠所在连续段到它为止的长度
+    run_length = np.where(is_backslash, index - run_start + 1, 0)
+    escaped = np.zeros(len(positions), dtype=bool)
+    escaped[1:] = (
+        is_backslash[:-1] & (positions[:-1] == positions[1:] - 1) & (run_length[:-1] & 1).astype(bool)
+    )
+
+    # 2. 字符串内部：未转义引号的前缀计数为奇数
+    in_string = (np.cumsum((chars == _QUOTE) & ~escaped) & 1).astype(bool)
+
+    # 3. 字符串外、未转义的花括号前缀和即嵌套深度
+    structural = ~escaped & ~in_string
+    depth = np.cumsum((chars == _LBRACE) & structural) - np.cumsum((chars == _RBRACE) & structural)
+
+    # 4. 深度为 0 的顶层逗号即切分点
+    split_points = positions[(chars == _COMMA) & structural & (depth == 0)].tolist()
+
+    json_strings: List[str] = []
+    start = 0
+    for point in split_points:
+        json_strings.append(buf[start:point].decode('utf-8').strip())
+        start = point + 1
+
+    # 添加最后一个JSON字符串
+    last_str = buf[start:].decode('utf-8').strip()
+    if last_str:
+        json_strings.append(last_str)
+
+    return json_strings
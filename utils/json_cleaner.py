@@ -6,16 +6,91 @@ JSON清理工具
 """
 
 import json
+import mmap
+import os
 import re
 import sys
-import argparse
 from pathlib import Path
 
+# 数组切分逻辑放在 _json_splitter 中；兼容包内导入与在 utils 目录下直接运行
+try:
+    from utils._json_splitter import split_top_level
+    from utils.json_io import read_text_file
+except ImportError:
+    from _json_splitter import split_top_level
+    from json_io import read_text_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps_pretty(data):
+    """序列化为 2 空格缩进、保留中文的 UTF-8 字节
+
+    解析统一使用标准库 json（保留超过 64 位的整数与 NaN/Infinity），orjson 只用于写出：
+    超过 64 位的整数等它无法编码的数据回退标准库；NaN/Infinity 按标准 JSON 写成 null。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _read_text(file_path):
+    """读取 UTF-8 文本文件，换行符与文本模式读取一样统一为 LF"""
+    return _normalize_newlines(read_text_file(file_path))
+
+
+def _normalize_newlines(text):
+    """统一换行符：CRLF 与单独的 CR 转为 LF（与文本模式读取的换行处理一致）"""
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _fingerprint(obj):
+    """对象的规范化指纹（键排序后的序列化结果），用作去重集合的键
+
+    用标准库 json 序列化：超过 64 位的整数可以编码，NaN 也不会与 null 得到相同指纹。
+    """
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True)
+
+
+# Markdown 中的 ```json 代码块
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+# HSLD.txt 中 ```json 围起的 {{[...]}} 数据块（在原始字节上匹配，兼容 CRLF 换行）
+_HSLD_JSON_BLOCK_RE = re.compile(rb'```json\r?\n(\{\{\[.*?\}\})\r?\n```', re.DOTALL)
+
+# 至多两层嵌套的内联JSON对象；每次重复都以'{'开头，不存在歧义回溯，模块加载时编译一次
+_INLINE_JSON_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+
+# 需要还原的转义序列：\\ \" \n \r \t
+_ESCAPE_RE = re.compile(r'\\([\\"nrt])')
+_ESCAPE_MAP = {'\\': '\\', '"': '"', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+def _unescape_match(match):
+    """把一个转义序列替换为对应字符"""
+    return _ESCAPE_MAP[match.group(1)]
+
+
+# 花括号匹配扫描时关心的结构字符
+_STRUCTURAL_CHAR_RE = re.compile(r'[{}"\\]')
+
 
 class JSONCleaner:
     """JSON数据清理器"""
     
-    def __init__(self):
+    def __init__(self, verbose=False):
+        """
+        Args:
+            verbose (bool): 是否逐条打印数组中每个字符串的处理过程
+        """
+        self.verbose = verbose
         self.cleaned_count = 0
         self.error_count = 0
     
@@ -30,28 +105,38 @@ class JSONCleaner:
             list: 提取到的JSON对象列表
         """
         json_objects = []
+        # 已收录对象的指纹，去重时查集合而不是逐个比较字典
+        seen = set()
         
         # 方法1: 查找```json代码块
-        import re
-        json_blocks = re.findall(r'```json\s*(.*?)\s*```', text, re.DOTALL)
-        for block in json_blocks:
+        # 同时检查代码块是否覆盖了全部内容（块外只有空白且每块都解析成功）
+        only_blocks = True
+        pos = 0
+        for match in _JSON_BLOCK_RE.finditer(text):
+            if text[pos:match.start()].strip():
+                only_blocks = False
+            pos = match.end()
             try:
-                obj = json.loads(block.strip())
+                obj = json.loads(match.group(1).strip())
                 json_objects.append(obj)
+                seen.add(_fingerprint(obj))
                 self.cleaned_count += 1
             except json.JSONDecodeError:
-                pass
+                only_blocks = False
         
-        # 方法2: 查找直接的JSON对象（以{开始，以}结束）
-        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-        matches = re.finditer(json_pattern, text, re.DOTALL)
+        # 内容已被代码块完整解析时，方法2/3只会在块内找到重复对象或内层片段，直接返回
+        if json_objects and only_blocks and not text[pos:].strip():
+            return json_objects
         
-        for match in matches:
+        # 方法2: 查找直接的JSON对象（以{开始，以}结束）
+        for match in _INLINE_JSON_RE.finditer(text):
             json_str = match.group()
             try:
                 obj = json.loads(json_str)
                 # 避免重复添加
-                if obj not in json_objects:
+                key = _fingerprint(obj)
+                if key not in seen:
+                    seen.add(key)
                     json_objects.append(obj)
                     self.cleaned_count += 1
             except json.JSONDecodeError:
@@ -59,7 +144,9 @@ class JSONCleaner:
         
         # 方法3: 查找更复杂的嵌套JSON（允许更深层嵌套）
         def find_json_objects(text, start_pos=0):
+            # 结果为 (指纹, 对象) 对，合并时不必重复计算指纹
             results = []
+            result_keys = set()
             pos = start_pos
             while pos < len(text):
                 # 查找下一个'{'
@@ -67,42 +154,46 @@ class JSONCleaner:
                 if start == -1:
                     break
                 
-                # 找到匹配的'}'
+                # 找到匹配的'}'：用正则直接跳到下一个结构字符（{ } " \），
+                # 普通字符在正则引擎内批量跳过，不再逐字符进入解释器循环
                 brace_count = 0
                 end = start
                 in_string = False
-                escape_next = False
+                i = start
                 
-                for i in range(start, len(text)):
-                    char = text[i]
-                    
-                    if escape_next:
-                        escape_next = False
-                        continue
+                while True:
+                    match = _STRUCTURAL_CHAR_RE.search(text, i)
+                    if match is None:
+                        break
+                    char = match.group()
+                    i = match.end()
                     
                     if char == '\\':
-                        escape_next = True
+                        # 反斜杠转义紧随其后的一个字符
+                        i += 1
                         continue
                     
-                    if char == '"' and not escape_next:
+                    if char == '"':
                         in_string = not in_string
                         continue
                     
                     if not in_string:
                         if char == '{':
                             brace_count += 1
-                        elif char == '}':
+                        else:
                             brace_count -= 1
                             if brace_count == 0:
-                                end = i
+                                end = i - 1
                                 break
                 
                 if brace_count == 0:
                     json_str = text[start:end + 1]
                     try:
                         obj = json.loads(json_str)
-                        if obj not in results:
-                            results.append(obj)
+                        key = _fingerprint(obj)
+                        if key not in result_keys:
+                            result_keys.add(key)
+                            results.append((key, obj))
                     except json.JSONDecodeError:
                         pass
                     pos = end + 1
@@ -112,8 +203,9 @@ class JSONCleaner:
             return results
         
         complex_objects = find_json_objects(text)
-        for obj in complex_objects:
-            if obj not in json_objects:
+        for key, obj in complex_objects:
+            if key not in seen:
+                seen.add(key)
                 json_objects.append(obj)
                 self.cleaned_count += 1
         
@@ -134,16 +226,9 @@ class JSONCleaner:
             if raw_data.startswith('"') and raw_data.endswith('"'):
                 raw_data = raw_data[1:-1]
             
-            # 处理双重转义的反斜杠
-            raw_data = raw_data.replace('\\\\', '\\')
-            
-            # 处理转义的引号
-            raw_data = raw_data.replace('\\"', '"')
-            
-            # 处理转义的换行符
-            raw_data = raw_data.replace('\\n', '\n')
-            raw_data = raw_data.replace('\\r', '\r')
-            raw_data = raw_data.replace('\\t', '\t')
+            # 一次扫描还原转义：双重转义的反斜杠、转义的引号和换行符
+            if '\\' in raw_data:
+                raw_data = _ESCAPE_RE.sub(_unescape_match, raw_data)
             
             # 首先尝试直接解析为JSON
             try:
@@ -187,59 +272,26 @@ class JSONCleaner:
             inner_content = raw_array_str[2:-2]
             
             # 分割各个JSON字符串
-            json_strings = []
-            current_str = ""
-            in_quotes = False
-            escape_next = False
-            bracket_count = 0
-            
-            for char in inner_content:
-                if escape_next:
-                    current_str += char
-                    escape_next = False
-                    continue
-                    
-                if char == '\\':
-                    escape_next = True
-                    current_str += char
-                    continue
-                    
-                if char == '"' and not escape_next:
-                    in_quotes = not in_quotes
-                    current_str += char
-                    continue
-                    
-                if not in_quotes:
-                    if char == '{':
-                        bracket_count += 1
-                    elif char == '}':
-                        bracket_count -= 1
-                    elif char == ',' and bracket_count == 0:
-                        # 找到分隔符
-                        json_strings.append(current_str.strip())
-                        current_str = ""
-                        continue
-                
-                current_str += char
-            
-            # 添加最后一个JSON字符串
-            if current_str.strip():
-                json_strings.append(current_str.strip())
+            json_strings = split_top_level(inner_content)
             
             # 清理每个JSON字符串
             cleaned_objects = []
+            verbose = self.verbose
             for i, json_str in enumerate(json_strings):
-                print(f"🔍 处理第{i+1}个字符串，长度: {len(json_str)} 字符")
-                print(f"   前100字符: {json_str[:100]}...")
+                if verbose:
+                    print(f"🔍 处理第{i+1}个字符串，长度: {len(json_str)} 字符")
+                    print(f"   前100字符: {json_str[:100]}...")
                 
                 cleaned_obj = self.clean_escaped_json(json_str)
                 if cleaned_obj:
                     # 如果返回的是列表（多个JSON对象），展开添加
                     if isinstance(cleaned_obj, list):
-                        print(f"   ✅ 从字符串{i+1}中提取了{len(cleaned_obj)}个JSON对象")
+                        if verbose:
+                            print(f"   ✅ 从字符串{i+1}中提取了{len(cleaned_obj)}个JSON对象")
                         cleaned_objects.extend(cleaned_obj)
                     else:
-                        print(f"   ✅ 从字符串{i+1}中提取了1个JSON对象")
+                        if verbose:
+                            print(f"   ✅ 从字符串{i+1}中提取了1个JSON对象")
                         cleaned_objects.append(cleaned_obj)
                 else:
                     print(f"   ❌ 第{i+1}个字符串解析失败")
@@ -270,62 +322,27 @@ class JSONCleaner:
                 # 如果直接解析失败，使用旧的方法
                 pass
             
-            # 分割各个JSON字符串的备用方法
-            json_strings = []
-            current_str = ""
-            in_quotes = False
-            escape_next = False
-            bracket_count = 0
-            
-            # 移除首尾的方括号
+            # 分割各个JSON字符串的备用方法（移除首尾的方括号）
             inner_content = raw_array_str[1:-1]
-            
-            for char in inner_content:
-                if escape_next:
-                    current_str += char
-                    escape_next = False
-                    continue
-                    
-                if char == '\\':
-                    escape_next = True
-                    current_str += char
-                    continue
-                    
-                if char == '"' and not escape_next:
-                    in_quotes = not in_quotes
-                    current_str += char
-                    continue
-                    
-                if not in_quotes:
-                    if char == '{':
-                        bracket_count += 1
-                    elif char == '}':
-                        bracket_count -= 1
-                    elif char == ',' and bracket_count == 0:
-                        # 找到分隔符
-                        json_strings.append(current_str.strip())
-                        current_str = ""
-                        continue
-                
-                current_str += char
-            
-            # 添加最后一个JSON字符串
-            if current_str.strip():
-                json_strings.append(current_str.strip())
+            json_strings = split_top_level(inner_content)
             
             # 清理每个JSON字符串
             cleaned_objects = []
+            verbose = self.verbose
             for i, json_str in enumerate(json_strings):
-                print(f"🔍 处理备用方法第{i+1}个字符串，长度: {len(json_str)} 字符")
+                if verbose:
+                    print(f"🔍 处理备用方法第{i+1}个字符串，长度: {len(json_str)} 字符")
                 
                 cleaned_obj = self.clean_escaped_json(json_str)
                 if cleaned_obj:
                     # 如果返回的是列表（多个JSON对象），展开添加
                     if isinstance(cleaned_obj, list):
-                        print(f"   ✅ 从备用方法字符串{i+1}中提取了{len(cleaned_obj)}个JSON对象")
+                        if verbose:
+                            print(f"   ✅ 从备用方法字符串{i+1}中提取了{len(cleaned_obj)}个JSON对象")
                         cleaned_objects.extend(cleaned_obj)
                     else:
-                        print(f"   ✅ 从备用方法字符串{i+1}中提取了1个JSON对象")
+                        if verbose:
+                            print(f"   ✅ 从备用方法字符串{i+1}中提取了1个JSON对象")
                         cleaned_objects.append(cleaned_obj)
                 else:
                     print(f"   ❌ 备用方法第{i+1}个字符串解析失败")
@@ -357,8 +374,7 @@ class JSONCleaner:
         
         try:
             # 读取文件内容
-            with open(input_path, 'r', encoding='utf-8') as f:
-                raw_content = f.read().strip()
+            raw_content = _read_text(input_path).strip()
             
             print(f"正在处理文件: {input_file}")
             print(f"原始内容长度: {len(raw_content)} 字符")
@@ -376,8 +392,8 @@ class JSONCleaner:
             
             if cleaned_data is not None:
                 # 写入清理后的JSON
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
+                with open(output_path, 'wb') as f:
+                    f.write(_dumps_pretty(cleaned_data))
                 
                 print(f"✅ 处理完成!")
                 print(f"📁 输出文件: {output_path}")
@@ -411,13 +427,15 @@ class JSONCleaner:
             cleaned_data = self.clean_escaped_json(raw_text)
         
         if cleaned_data is not None:
-            return json.dumps(cleaned_data, ensure_ascii=False, indent=2)
+            return _dumps_pretty(cleaned_data).decode('utf-8')
         else:
             return None
 
 
 def main():
     """主函数"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="清理从数据库中提取的包含转义字符的JSON数据",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -432,10 +450,11 @@ def main():
     parser.add_argument('input_file', nargs='?', help='输入文件路径')
     parser.add_argument('-o', '--output', help='输出文件路径')
     parser.add_argument('-t', '--text', help='直接处理JSON文本')
+    parser.add_argument('-v', '--verbose', action='store_true', help='逐条打印数组元素的处理过程')
     
     args = parser.parse_args()
     
-    cleaner = JSONCleaner()
+    cleaner = JSONCleaner(verbose=args.verbose)
     
     if args.text:
         # 处理文本模式
@@ -470,32 +489,34 @@ def test_hsld_file():
         return
     
     try:
-        # 读取文件内容
-        with open(hsld_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # 映射文件后一次正则扫描定位JSON数据块（从```json开始到```结束），
+        # 只把数据块本身解码成字符串，不读入整个文件
+        json_content = None
+        with open(hsld_file, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    match = _HSLD_JSON_BLOCK_RE.search(mm)
+                    if match:
+                        json_start = match.start()
+                        json_end = match.end(1) - 2  # 结尾 '}}' 的位置
+                        json_content = _normalize_newlines(match.group(1).decode('utf-8'))
         
         print(f"📁 文件路径: {hsld_file}")
-        print(f"📊 文件大小: {len(content)} 字符")
-        
-        # 查找JSON数据部分（从```json开始到```结束）
-        json_start = content.find('```json\n{{[')
-        json_end = content.find('}}\n```', json_start)
+        print(f"📊 文件大小: {file_size} 字节")
         
-        if json_start == -1 or json_end == -1:
+        if json_content is None:
             print("❌ 未找到JSON数据块")
             return
         
-        # 提取JSON数据
-        json_content = content[json_start + 8:json_end + 2]  # +8 跳过 '```json\n', +2 包含 '}}'
-        
         print(f"🔍 找到JSON数据块:")
-        print(f"   起始位置: {json_start}")
-        print(f"   结束位置: {json_end}")
+        print(f"   起始位置: {json_start}（字节偏移）")
+        print(f"   结束位置: {json_end}（字节偏移）")
         print(f"   JSON长度: {len(json_content)} 字符")
         print(f"   JSON前100字符: {json_content[:100]}...")
         
-        # 创建清理器
-        cleaner = JSONCleaner()
+        # 创建清理器（测试时逐条打印处理过程）
+        cleaner = JSONCleaner(verbose=True)
         
         # 处理JSON数据
         print("\n🧹 开始清理JSON数据...")
@@ -515,14 +536,15 @@ def test_hsld_file():
             
             # 保存清理后的数据
             output_file = hsld_file.parent / "HSLD_cleaned.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
+            pretty = _dumps_pretty(cleaned_data)
+            with open(output_file, 'wb') as f:
+                f.write(pretty)
             
             print(f"💾 清理后的数据已保存到: {output_file}")
             
             # 显示清理后数据的预览
             print(f"\n📄 清理后数据预览:")
-            preview = json.dumps(cleaned_data, ensure_ascii=False, indent=2)
+            preview = pretty.decode('utf-8')
             if len(preview) > 500:
                 print(preview[:500] + "...")
             else:
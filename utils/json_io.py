@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON文件读写工具
+================
+
+各模块共用的文件读写入口：有 orjson 时直接解析/编码原始字节，缺失时回退标准库 json。
+超过 MMAP_MIN_SIZE 的文件通过 mmap 映射后解析/解码，省去 read 出一份完整 bytes 副本。
+"""
+
+import json
+import mmap
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 超过该大小的文件用 mmap 映射后直接解析，小文件直接 read 更快
+MMAP_MIN_SIZE = 16 * 1024
+
+
+def read_json_file(file_path: str) -> Any:
+    """
+    读取并解析JSON文件
+
+    Args:
+        file_path: JSON文件路径
+
+    Returns:
+        解析后的数据；解析失败抛出 json.JSONDecodeError（orjson 的解析异常是其子类）
+    """
+    if orjson is not None:
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                        return orjson.loads(view)
+                return orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            # orjson 不接受 NaN/Infinity 等标准库可以解析的写法，交给下面的标准库重新解析
+            pass
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_text_file(file_path: str) -> str:
+    """
+    以 UTF-8 读取整个文本文件（不做换行符转换）
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        文件内容
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return str(view, 'utf-8')
+        return f.read().decode('utf-8')
+
+
+def write_json_file(file_path: str, data: Any, durable: bool = False) -> None:
+    """
+    写入带2空格缩进、保留中文的JSON文件：一次编码、一次写入
+
+    默认直接覆盖写入，不做 fsync，适合可重新生成的文件。
+    durable=True 用于最终报告：先写入同目录临时文件并 fsync，再用 os.replace
+    原子替换目标文件，中途失败不会留下半截文件。
+
+    Args:
+        file_path: 输出文件路径
+        data: 待写出的数据
+        durable: 是否原子替换并落盘
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+    if not durable:
+        with open(file_path, 'wb') as f:
+            f.write(payload)
+        return
+
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
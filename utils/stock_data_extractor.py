@@ -10,6 +10,12 @@ import os
 from typing import Dict, List, Optional
 from datetime import datetime
 
+# 兼容包内导入与在 utils 目录下直接运行
+try:
+    from utils.json_io import read_json_file, write_json_file
+except ImportError:
+    from json_io import read_json_file, write_json_file
+
 
 class StockDataExtractor:
     """股票数据提取器"""
@@ -23,13 +29,20 @@ class StockDataExtractor:
         """
         self.data_file_path = data_file_path
         self.data = None
+        # 名称/代码 -> 股票数据的索引，首次精确查找时构建
+        self._by_name = None
+        self._by_code = None
+        # (名称, 大写代码, 股票数据) 列表，首次模糊搜索时构建
+        self._search_index = None
         self.load_data()
     
     def load_data(self):
         """加载JSON数据"""
         try:
-            with open(self.data_file_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            self.data = read_json_file(self.data_file_path)
+            self._by_name = None
+            self._by_code = None
+            self._search_index = None
             print(f"✅ 成功加载数据文件: {self.data_file_path}")
             print(f"📊 数据包含 {self.data['meta']['stock_count']} 只股票")
             print(f"📅 交易日期: {self.data['meta']['trade_date_display']}")
@@ -40,19 +53,32 @@ class StockDataExtractor:
             print(f"❌ 错误: JSON文件格式错误 {self.data_file_path}")
             raise
     
+    def _build_index(self):
+        """一次遍历建立名称与代码索引（重名/重码时保留第一条，与顺序查找结果一致）"""
+        by_name = {}
+        by_code = {}
+        for stock in self.data['stocks']:
+            by_name.setdefault(stock['name'], stock)
+            by_code.setdefault(stock['ts_code'], stock)
+        self._by_name = by_name
+        self._by_code = by_code
+    
     def list_all_stocks(self) -> List[Dict]:
         """列出所有股票的基本信息"""
         if not self.data:
             return []
         
         stocks_info = []
+        append = stocks_info.append
         for stock in self.data['stocks']:
-            stocks_info.append({
+            # 每只股票只取一次 basic_info
+            basic_info = stock['basic_info']
+            append({
                 'name': stock['name'],
                 'ts_code': stock['ts_code'],
-                'close': stock['basic_info']['close'],
-                'pct_change': stock['basic_info']['pct_change'],
-                'net_amount': stock['basic_info']['net_amount']
+                'close': basic_info['close'],
+                'pct_change': basic_info['pct_change'],
+                'net_amount': basic_info['net_amount']
             })
         
         return stocks_info
@@ -70,18 +96,20 @@ class StockDataExtractor:
         if not self.data:
             return []
         
-        query = query.strip().upper()
-        matches = []
+        if self._search_index is None:
+            # 代码统一转大写只做一次，之后每次搜索直接比较
+            self._search_index = [
+                (stock['name'], stock['ts_code'].upper(), stock)
+                for stock in self.data['stocks']
+            ]
         
-        for stock in self.data['stocks']:
-            # 匹配股票名称
-            if query in stock['name']:
-                matches.append(stock)
-            # 匹配股票代码
-            elif query in stock['ts_code'].upper():
-                matches.append(stock)
+        query = query.strip().upper()
         
-        return matches
+        # 匹配股票名称或股票代码
+        return [
+            stock for name, code, stock in self._search_index
+            if query in name or query in code
+        ]
     
     def extract_stock_by_name(self, stock_name: str) -> Optional[Dict]:
         """
@@ -96,11 +124,9 @@ class StockDataExtractor:
         if not self.data:
             return None
         
-        for stock in self.data['stocks']:
-            if stock['name'] == stock_name:
-                return stock
-        
-        return None
+        if self._by_name is None:
+            self._build_index()
+        return self._by_name.get(stock_name)
     
     def extract_stock_by_code(self, ts_code: str) -> Optional[Dict]:
         """
@@ -115,12 +141,9 @@ class StockDataExtractor:
         if not self.data:
             return None
         
-        ts_code = ts_code.upper()
-        for stock in self.data['stocks']:
-            if stock['ts_code'] == ts_code:
-                return stock
-        
-        return None
+        if self._by_code is None:
+            self._build_index()
+        return self._by_code.get(ts_code.upper())
     
     def save_stock_data(self, stock_data: Dict, output_dir: str = "data/extracted") -> str:
         """
@@ -163,8 +186,7 @@ class StockDataExtractor:
         }
         
         # 保存文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(extracted_data, f, ensure_ascii=False, indent=2)
+        write_json_file(filepath, extracted_data)
         
         print(f"✅ 已保存 {stock_name} 的数据到: {filepath}")
         return filepath